@@ -0,0 +1,31 @@
+"""
+Shared FastAPI dependencies for API routes
+"""
+
+from dataclasses import dataclass
+from typing import Annotated
+from fastapi import Depends
+from pymongo.asynchronous.database import AsyncDatabase
+from bson import ObjectId
+
+from app.database import db
+from app.cache import CacheManager, cache_manager
+from app.utils.security import get_current_user_id, get_current_user_oid
+
+@dataclass(frozen=True, slots=True)
+class RequestContext:
+    """Authenticated caller plus the shared database and cache handles"""
+    user_id: str
+    user_oid: ObjectId
+    db: AsyncDatabase
+    cache: CacheManager
+
+async def get_request_context(
+    user_id: str = Depends(get_current_user_id),
+    user_oid: ObjectId = Depends(get_current_user_oid)
+) -> RequestContext:
+    """Dependency resolving the caller once and bundling the process-wide db/cache singletons"""
+    return RequestContext(user_id=user_id, user_oid=user_oid, db=db.database, cache=cache_manager)
+
+# Annotated alias so endpoints declare a single `ctx: Context` parameter
+Context = Annotated[RequestContext, Depends(get_request_context)]
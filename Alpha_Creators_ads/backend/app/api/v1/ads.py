@@ -3,28 +3,54 @@ Ad Management API routes
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi.responses import ORJSONResponse
+from pymongo.asynchronous.database import AsyncDatabase
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 import logging
 from bson import ObjectId
 
 from app.database import get_db
-from app.cache import CacheManager, CacheKeys
-from app.models.ad import AdCreate, AdUpdate, AdResponse, AdListResponse, AdContent
-from app.utils.security import get_current_user_id
+from app.cache import CacheManager, CacheKeys, get_cache
+from app.models.ad import AdCreate, AdUpdate, AdResponse, AdContent
+from app.utils.security import get_current_user_id, get_current_user_oid
 from app.config import settings
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+def _ad_to_dict(ad_doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a stored ad document into its API response without re-validating it"""
+    return {
+        "id": str(ad_doc["_id"]),
+        "userId": str(ad_doc["userId"]),
+        "campaignId": str(ad_doc["campaignId"]),
+        "title": ad_doc["title"],
+        "description": ad_doc["description"],
+        "type": ad_doc["type"],
+        "format": ad_doc["format"],
+        "status": ad_doc["status"],
+        "content": ad_doc["content"],
+        "targeting": ad_doc.get("targeting"),
+        "placement": ad_doc["placement"],
+        "optimization": ad_doc["optimization"],
+        "analytics": ad_doc["analytics"],
+        "aiGenerated": ad_doc.get("aiGenerated", False),
+        "variations": ad_doc.get("variations", []),
+        "createdAt": ad_doc["createdAt"],
+        "updatedAt": ad_doc["updatedAt"],
+        "approvedAt": ad_doc.get("approvedAt"),
+        "publishedAt": ad_doc.get("publishedAt")
+    }
+
 @router.post("/", response_model=AdResponse, status_code=status.HTTP_201_CREATED)
 async def create_ad(
     ad_data: AdCreate,
     background_tasks: BackgroundTasks,
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     🎨 **Create New Ad**
@@ -49,7 +75,7 @@ async def create_ad(
     # Verify campaign exists and belongs to user
     campaign_doc = await db.campaigns.find_one({
         "_id": ObjectId(ad_data.campaignId),
-        "userId": ObjectId(current_user_id)
+        "userId": current_user_oid
     })
     
     if not campaign_doc:
@@ -60,12 +86,12 @@ async def create_ad(
     
     # Check ad limits based on subscription
     user_doc = await db.users.find_one(
-        {"_id": ObjectId(current_user_id)},
+        {"_id": current_user_oid},
         {"subscription": 1, "apiUsage": 1}
     )
     
     ad_count = await db.ads.count_documents({
-        "userId": ObjectId(current_user_id),
+        "userId": current_user_oid,
         "campaignId": ObjectId(ad_data.campaignId)
     })
     
@@ -86,20 +112,20 @@ async def create_ad(
     # Create ad document
     now = datetime.utcnow()
     ad_doc = {
-        "userId": ObjectId(current_user_id),
+        "userId": current_user_oid,
         "campaignId": ObjectId(ad_data.campaignId),
         "title": ad_data.title,
         "description": ad_data.description,
         "type": ad_data.type,
         "format": ad_data.format,
         "status": "draft",
-        "content": ad_data.content.dict(),
-        "targeting": ad_data.targeting.dict() if ad_data.targeting else campaign_doc.get("targeting", {}),
+        "content": ad_data.content.model_dump(),
+        "targeting": ad_data.targeting.model_dump() if ad_data.targeting else campaign_doc.get("targeting", {}),
         "placement": ad_data.placement,
         "optimization": {
             "objective": ad_data.optimization.objective if ad_data.optimization else "clicks",
             "bidAmount": ad_data.optimization.bidAmount if ad_data.optimization else None,
-            "schedule": ad_data.optimization.schedule.dict() if ad_data.optimization and ad_data.optimization.schedule else None,
+            "schedule": ad_data.optimization.schedule.model_dump() if ad_data.optimization and ad_data.optimization.schedule else None,
             "autoOptimize": True
         },
         "analytics": {
@@ -140,7 +166,7 @@ async def create_ad(
     
     # Update API usage
     await db.users.update_one(
-        {"_id": ObjectId(current_user_id)},
+        {"_id": current_user_oid},
         {
             "$inc": {
                 "apiUsage.adsGenerated": 1,
@@ -174,9 +200,9 @@ async def create_ad(
         publishedAt=None
     )
 
-@router.get("/", response_model=AdListResponse)
+@router.get("/", response_class=ORJSONResponse)
 async def get_ads(
-    current_user_id: str = Depends(get_current_user_id),
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
     campaign_id: Optional[str] = Query(None),
     status_filter: Optional[str] = Query(None, regex="^(draft|pending|approved|active|paused|rejected|archived)$"),
     type_filter: Optional[str] = Query(None),
@@ -184,9 +210,9 @@ async def get_ads(
     search: Optional[str] = Query(None),
     sort_by: str = Query("createdAt", regex="^(createdAt|updatedAt|title|status|ctr|spent)$"),
     sort_order: str = Query("desc", regex="^(asc|desc)$"),
-    limit: int = Query(default=20, le=100),
+    limit: int = Query(default=20, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    db: AsyncDatabase = Depends(get_db)
 ):
     """
     📝 **Get User Ads**
@@ -208,7 +234,7 @@ async def get_ads(
     """
     
     # Build query
-    query = {"userId": ObjectId(current_user_id)}
+    query = {"userId": current_user_oid}
     
     if campaign_id:
         query["campaignId"] = ObjectId(campaign_id)
@@ -238,44 +264,24 @@ async def get_ads(
     # Get ads
     ads_cursor = db.ads.find(query).sort(sort_field, sort_direction).skip(offset).limit(limit)
     
-    ads = []
-    async for ad_doc in ads_cursor:
-        ads.append(AdResponse(
-            id=str(ad_doc["_id"]),
-            userId=str(ad_doc["userId"]),
-            campaignId=str(ad_doc["campaignId"]),
-            title=ad_doc["title"],
-            description=ad_doc["description"],
-            type=ad_doc["type"],
-            format=ad_doc["format"],
-            status=ad_doc["status"],
-            content=AdContent(**ad_doc["content"]),
-            targeting=ad_doc.get("targeting"),
-            placement=ad_doc["placement"],
-            optimization=ad_doc["optimization"],
-            analytics=ad_doc["analytics"],
-            aiGenerated=ad_doc.get("aiGenerated", False),
-            variations=ad_doc.get("variations", []),
-            createdAt=ad_doc["createdAt"],
-            updatedAt=ad_doc["updatedAt"],
-            approvedAt=ad_doc.get("approvedAt"),
-            publishedAt=ad_doc.get("publishedAt")
-        ))
-    
-    return AdListResponse(
-        ads=ads,
-        total=total,
-        limit=limit,
-        offset=offset,
-        hasMore=offset + len(ads) < total
-    )
+    ads = [_ad_to_dict(ad_doc) for ad_doc in await ads_cursor.to_list(length=limit)]
+    
+    # Returned as a response directly so the page skips the jsonable_encoder pass
+    return ORJSONResponse({
+        "ads": ads,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "hasMore": offset + len(ads) < total
+    })
 
 @router.get("/{ad_id}", response_model=AdResponse)
 async def get_ad(
     ad_id: str,
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     📄 **Get Ad Details**
@@ -291,7 +297,7 @@ async def get_ad(
     # Get from database
     ad_doc = await db.ads.find_one({
         "_id": ObjectId(ad_id),
-        "userId": ObjectId(current_user_id)
+        "userId": current_user_oid
     })
     
     if not ad_doc:
@@ -333,8 +339,9 @@ async def update_ad(
     ad_id: str,
     ad_update: AdUpdate,
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     ✏️ **Update Ad**
@@ -352,7 +359,7 @@ async def update_ad(
     # Check if ad exists and belongs to user
     existing_ad = await db.ads.find_one({
         "_id": ObjectId(ad_id),
-        "userId": ObjectId(current_user_id)
+        "userId": current_user_oid
     })
     
     if not existing_ad:
@@ -369,7 +376,7 @@ async def update_ad(
         )
     
     # Prepare update data
-    update_data = ad_update.dict(exclude_unset=True)
+    update_data = ad_update.model_dump(exclude_unset=True)
     if update_data:
         update_data["updatedAt"] = datetime.utcnow()
         
@@ -387,7 +394,7 @@ async def update_ad(
     # Get updated ad
     updated_ad = await db.ads.find_one({
         "_id": ObjectId(ad_id),
-        "userId": ObjectId(current_user_id)
+        "userId": current_user_oid
     })
     
     # Update cache
@@ -423,9 +430,9 @@ async def update_ad(
 @router.post("/{ad_id}/submit-for-review")
 async def submit_ad_for_review(
     ad_id: str,
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     📋 **Submit Ad for Review**
@@ -436,7 +443,7 @@ async def submit_ad_for_review(
     # Check ad exists and belongs to user
     ad_doc = await db.ads.find_one({
         "_id": ObjectId(ad_id),
-        "userId": ObjectId(current_user_id)
+        "userId": current_user_oid
     })
     
     if not ad_doc:
@@ -486,9 +493,9 @@ async def submit_ad_for_review(
 @router.post("/{ad_id}/activate")
 async def activate_ad(
     ad_id: str,
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     ▶️ **Activate Ad**
@@ -499,7 +506,7 @@ async def activate_ad(
     # Check ad exists and belongs to user
     ad_doc = await db.ads.find_one({
         "_id": ObjectId(ad_id),
-        "userId": ObjectId(current_user_id)
+        "userId": current_user_oid
     })
     
     if not ad_doc:
@@ -549,9 +556,9 @@ async def activate_ad(
 @router.post("/{ad_id}/pause")
 async def pause_ad(
     ad_id: str,
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     ⏸️ **Pause Ad**
@@ -562,7 +569,7 @@ async def pause_ad(
     # Check ad exists and belongs to user
     ad_doc = await db.ads.find_one({
         "_id": ObjectId(ad_id),
-        "userId": ObjectId(current_user_id)
+        "userId": current_user_oid
     })
     
     if not ad_doc:
@@ -598,9 +605,9 @@ async def pause_ad(
 @router.delete("/{ad_id}")
 async def delete_ad(
     ad_id: str,
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     🗑️ **Delete Ad**
@@ -611,7 +618,7 @@ async def delete_ad(
     # Check ad exists and belongs to user
     ad_doc = await db.ads.find_one({
         "_id": ObjectId(ad_id),
-        "userId": ObjectId(current_user_id)
+        "userId": current_user_oid
     })
     
     if not ad_doc:
@@ -639,9 +646,9 @@ async def delete_ad(
 @router.get("/{ad_id}/analytics", response_model=Dict[str, Any])
 async def get_ad_analytics(
     ad_id: str,
-    current_user_id: str = Depends(get_current_user_id),
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
     date_range: str = Query("7d", regex="^(1d|7d|30d|90d|all)$"),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    db: AsyncDatabase = Depends(get_db)
 ):
     """
     📊 **Get Ad Analytics**
@@ -659,7 +666,7 @@ async def get_ad_analytics(
     # Check ad exists and belongs to user
     ad_doc = await db.ads.find_one({
         "_id": ObjectId(ad_id),
-        "userId": ObjectId(current_user_id)
+        "userId": current_user_oid
     }, {"analytics": 1, "createdAt": 1, "publishedAt": 1})
     
     if not ad_doc:
@@ -691,32 +698,54 @@ async def get_ad_analytics(
             }
         },
         {
-            "$group": {
-                "_id": None,
-                "totalImpressions": {"$sum": "$impressions"},
-                "totalClicks": {"$sum": "$clicks"},
-                "totalConversions": {"$sum": "$conversions"},
-                "totalSpent": {"$sum": "$spent"},
-                "totalEngagement": {"$sum": "$engagement.total"},
-                "dailyMetrics": {
-                    "$push": {
-                        "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
-                        "impressions": "$impressions",
-                        "clicks": "$clicks",
-                        "conversions": "$conversions",
-                        "spent": "$spent",
-                        "engagement": "$engagement"
+            # Grand totals and per-day totals over the same match; no per-event arrays
+            "$facet": {
+                "totals": [
+                    {
+                        "$group": {
+                            "_id": None,
+                            "totalImpressions": {"$sum": "$impressions"},
+                            "totalClicks": {"$sum": "$clicks"},
+                            "totalConversions": {"$sum": "$conversions"},
+                            "totalSpent": {"$sum": "$spent"},
+                            "totalEngagement": {"$sum": "$engagement.total"}
+                        }
+                    }
+                ],
+                "dailyMetrics": [
+                    {
+                        "$group": {
+                            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+                            "impressions": {"$sum": "$impressions"},
+                            "clicks": {"$sum": "$clicks"},
+                            "conversions": {"$sum": "$conversions"},
+                            "spent": {"$sum": "$spent"},
+                            "engagement": {"$sum": "$engagement.total"}
+                        }
+                    },
+                    {"$sort": {"_id": 1}},
+                    {
+                        "$project": {
+                            "_id": 0,
+                            "date": "$_id",
+                            "impressions": 1,
+                            "clicks": 1,
+                            "conversions": 1,
+                            "spent": 1,
+                            "engagement": 1
+                        }
                     }
-                }
+                ]
             }
         }
     ]
     
     # Execute analytics aggregation
-    analytics_result = await db.analytics.aggregate(analytics_pipeline).to_list(1)
+    analytics_result = (await (await db.analytics.aggregate(analytics_pipeline)).to_list(1))[0]
+    daily_metrics = analytics_result["dailyMetrics"]
     
-    if analytics_result:
-        analytics_data = analytics_result[0]
+    if analytics_result["totals"]:
+        analytics_data = analytics_result["totals"][0]
         total_impressions = analytics_data["totalImpressions"]
         total_clicks = analytics_data["totalClicks"]
         total_conversions = analytics_data["totalConversions"]
@@ -760,14 +789,15 @@ async def get_ad_analytics(
                 "rate": round(engagement_rate, 2)
             }
         },
-        "dailyMetrics": analytics_result[0]["dailyMetrics"] if analytics_result else []
+        "dailyMetrics": daily_metrics
     }
 
 @router.post("/{ad_id}/duplicate", response_model=AdResponse)
 async def duplicate_ad(
     ad_id: str,
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db)
 ):
     """
     📋 **Duplicate Ad**
@@ -778,7 +808,7 @@ async def duplicate_ad(
     # Get original ad
     original_ad = await db.ads.find_one({
         "_id": ObjectId(ad_id),
-        "userId": ObjectId(current_user_id)
+        "userId": current_user_oid
     })
     
     if not original_ad:
@@ -3,7 +3,7 @@ AI-Powered Ad Generation API routes
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.asynchronous.database import AsyncDatabase
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 import logging
@@ -12,8 +12,8 @@ import openai
 from bson import ObjectId
 
 from app.database import get_db
-from app.cache import CacheManager, CacheKeys
-from app.utils.security import get_current_user_id
+from app.cache import CacheManager, CacheKeys, get_cache
+from app.utils.security import get_current_user_id, get_current_user_oid
 from app.config import settings
 
 router = APIRouter()
@@ -26,8 +26,9 @@ openai.api_key = settings.OPENAI_API_KEY
 async def generate_ad_content(
     request_data: dict,
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     🤖 **Generate AI-Powered Ad Content**
@@ -51,7 +52,7 @@ async def generate_ad_content(
     
     # Check user API quota
     user_doc = await db.users.find_one(
-        {"_id": ObjectId(current_user_id)},
+        {"_id": current_user_oid},
         {"subscription": 1, "apiUsage": 1}
     )
     
@@ -157,7 +158,7 @@ async def generate_ad_content(
         
         # Store generation request in database for analytics
         generation_doc = {
-            "userId": ObjectId(current_user_id),
+            "userId": current_user_oid,
             "requestData": request_data,
             "aiResponse": ai_content,
             "model": "gpt-4",
@@ -169,7 +170,7 @@ async def generate_ad_content(
         
         # Update user API usage
         await db.users.update_one(
-            {"_id": ObjectId(current_user_id)},
+            {"_id": current_user_oid},
             {
                 "$inc": {
                     "apiUsage.apiCallsThisMonth": 1,
@@ -217,7 +218,8 @@ async def generate_ad_images(
     request_data: dict,
     background_tasks: BackgroundTasks,
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db)
 ):
     """
     🎨 **Generate AI-Powered Ad Images**
@@ -240,7 +242,7 @@ async def generate_ad_images(
     
     # Check user quota
     user_doc = await db.users.find_one(
-        {"_id": ObjectId(current_user_id)},
+        {"_id": current_user_oid},
         {"subscription": 1, "apiUsage": 1}
     )
     
@@ -262,7 +264,7 @@ async def generate_ad_images(
     # Count images generated this month
     current_month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     images_generated = await db.ai_generations.count_documents({
-        "userId": ObjectId(current_user_id),
+        "userId": current_user_oid,
         "requestData.type": "image",
         "createdAt": {"$gte": current_month_start}
     })
@@ -320,7 +322,7 @@ async def generate_ad_images(
         
         # Store generation request
         generation_doc = {
-            "userId": ObjectId(current_user_id),
+            "userId": current_user_oid,
             "requestData": {**request_data, "type": "image"},
             "aiResponse": {"images": generated_images},
             "model": "dall-e-3",
@@ -355,8 +357,8 @@ async def generate_ad_images(
 @router.post("/optimize-campaign")
 async def optimize_campaign_ai(
     campaign_id: str,
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db)
 ):
     """
     🚀 **AI-Powered Campaign Optimization**
@@ -374,7 +376,7 @@ async def optimize_campaign_ai(
     # Get campaign data
     campaign_doc = await db.campaigns.find_one({
         "_id": ObjectId(campaign_id),
-        "userId": ObjectId(current_user_id)
+        "userId": current_user_oid
     })
     
     if not campaign_doc:
@@ -471,7 +473,7 @@ async def optimize_campaign_ai(
         
         # Store optimization analysis
         optimization_doc = {
-            "userId": ObjectId(current_user_id),
+            "userId": current_user_oid,
             "campaignId": ObjectId(campaign_id),
             "analysisData": {
                 "campaignMetrics": analytics_data,
@@ -512,11 +514,11 @@ async def optimize_campaign_ai(
 
 @router.get("/generation-history")
 async def get_generation_history(
-    current_user_id: str = Depends(get_current_user_id),
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
     limit: int = 20,
     offset: int = 0,
     generation_type: Optional[str] = None,
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    db: AsyncDatabase = Depends(get_db)
 ):
     """
     📋 **Get AI Generation History**
@@ -524,7 +526,7 @@ async def get_generation_history(
     Retrieve user's AI generation history and analytics.
     """
     
-    query = {"userId": ObjectId(current_user_id)}
+    query = {"userId": current_user_oid}
     if generation_type:
         query["requestData.type"] = generation_type
     
@@ -535,7 +537,7 @@ async def get_generation_history(
     generations_cursor = db.ai_generations.find(query).sort("createdAt", -1).skip(offset).limit(limit)
     
     generations = []
-    async for gen_doc in generations_cursor:
+    for gen_doc in await generations_cursor.to_list(length=limit):
         generations.append({
             "id": str(gen_doc["_id"]),
             "type": gen_doc["requestData"].get("type", "content"),
@@ -556,8 +558,8 @@ async def get_generation_history(
 
 @router.get("/quota-usage")
 async def get_quota_usage(
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db)
 ):
     """
     📊 **Get AI Quota Usage**
@@ -566,7 +568,7 @@ async def get_quota_usage(
     """
     
     user_doc = await db.users.find_one(
-        {"_id": ObjectId(current_user_id)},
+        {"_id": current_user_oid},
         {"subscription": 1, "apiUsage": 1}
     )
     
@@ -597,7 +599,7 @@ async def get_quota_usage(
     # Count current month usage
     current_month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     images_generated = await db.ai_generations.count_documents({
-        "userId": ObjectId(current_user_id),
+        "userId": current_user_oid,
         "requestData.type": "image",
         "createdAt": {"$gte": current_month_start}
     })
@@ -3,15 +3,15 @@ Analytics and Reporting API routes
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.asynchronous.database import AsyncDatabase
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 import logging
 from bson import ObjectId
 
 from app.database import get_db
-from app.cache import CacheManager, CacheKeys
-from app.utils.security import get_current_user_id
+from app.cache import CacheManager, CacheKeys, get_cache
+from app.utils.security import get_current_user_id, get_current_user_oid
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -19,9 +19,10 @@ logger = logging.getLogger(__name__)
 @router.get("/dashboard")
 async def get_dashboard_analytics(
     current_user_id: str = Depends(get_current_user_id),
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
     date_range: str = Query("30d", regex="^(7d|30d|90d|1y)$"),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     📊 **Dashboard Analytics Overview**
@@ -58,7 +59,7 @@ async def get_dashboard_analytics(
     campaign_pipeline = [
         {
             "$match": {
-                "userId": ObjectId(current_user_id),
+                "userId": current_user_oid,
                 "createdAt": {"$gte": start_date, "$lte": now}
             }
         },
@@ -84,7 +85,7 @@ async def get_dashboard_analytics(
         }
     ]
     
-    campaign_analytics = await db.campaigns.aggregate(campaign_pipeline).to_list(1)
+    campaign_analytics = await (await db.campaigns.aggregate(campaign_pipeline)).to_list(1)
     campaign_data = campaign_analytics[0] if campaign_analytics else {
         "totalCampaigns": 0,
         "activeCampaigns": 0,
@@ -99,7 +100,7 @@ async def get_dashboard_analytics(
     ad_pipeline = [
         {
             "$match": {
-                "userId": ObjectId(current_user_id),
+                "userId": current_user_oid,
                 "createdAt": {"$gte": start_date, "$lte": now}
             }
         },
@@ -121,7 +122,7 @@ async def get_dashboard_analytics(
         }
     ]
     
-    ad_analytics = await db.ads.aggregate(ad_pipeline).to_list(1)
+    ad_analytics = await (await db.ads.aggregate(ad_pipeline)).to_list(1)
     ad_data = ad_analytics[0] if ad_analytics else {
         "totalAds": 0,
         "activeAds": 0,
@@ -141,7 +142,7 @@ async def get_dashboard_analytics(
     # Get top performing campaigns
     top_campaigns_cursor = db.campaigns.find(
         {
-            "userId": ObjectId(current_user_id),
+            "userId": current_user_oid,
             "createdAt": {"$gte": start_date, "$lte": now}
         },
         {"name": 1, "analytics": 1, "status": 1}
@@ -161,7 +162,7 @@ async def get_dashboard_analytics(
     # Get top performing ads
     top_ads_cursor = db.ads.find(
         {
-            "userId": ObjectId(current_user_id),
+            "userId": current_user_oid,
             "createdAt": {"$gte": start_date, "$lte": now}
         },
         {"title": 1, "analytics": 1, "status": 1, "format": 1}
@@ -183,7 +184,7 @@ async def get_dashboard_analytics(
     daily_trends_pipeline = [
         {
             "$match": {
-                "userId": ObjectId(current_user_id),
+                "userId": current_user_oid,
                 "timestamp": {"$gte": start_date, "$lte": now}
             }
         },
@@ -206,7 +207,7 @@ async def get_dashboard_analytics(
         }
     ]
     
-    daily_trends = await db.analytics.aggregate(daily_trends_pipeline).to_list(None)
+    daily_trends = await (await db.analytics.aggregate(daily_trends_pipeline)).to_list(None)
     
     # Prepare response
     dashboard_data = {
@@ -244,10 +245,10 @@ async def get_dashboard_analytics(
 
 @router.get("/performance-comparison")
 async def get_performance_comparison(
-    current_user_id: str = Depends(get_current_user_id),
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
     period_1: str = Query("30d", regex="^(7d|30d|90d)$"),
     period_2: str = Query("60d", regex="^(7d|30d|90d)$"),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    db: AsyncDatabase = Depends(get_db)
 ):
     """
     📈 **Performance Comparison**
@@ -270,7 +271,7 @@ async def get_performance_comparison(
         pipeline = [
             {
                 "$match": {
-                    "userId": ObjectId(current_user_id),
+                    "userId": current_user_oid,
                     "timestamp": {"$gte": start_date, "$lte": now}
                 }
             },
@@ -285,7 +286,7 @@ async def get_performance_comparison(
             }
         ]
         
-        result = await db.analytics.aggregate(pipeline).to_list(1)
+        result = await (await db.analytics.aggregate(pipeline)).to_list(1)
         return result[0] if result else {
             "impressions": 0,
             "clicks": 0,
@@ -334,10 +335,10 @@ async def get_performance_comparison(
 
 @router.get("/audience-insights")
 async def get_audience_insights(
-    current_user_id: str = Depends(get_current_user_id),
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
     campaign_id: Optional[str] = Query(None),
     date_range: str = Query("30d", regex="^(7d|30d|90d)$"),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    db: AsyncDatabase = Depends(get_db)
 ):
     """
     👥 **Audience Insights**
@@ -359,7 +360,7 @@ async def get_audience_insights(
     
     # Build query
     query = {
-        "userId": ObjectId(current_user_id),
+        "userId": current_user_oid,
         "timestamp": {"$gte": start_date, "$lte": now}
     }
     
@@ -401,7 +402,7 @@ async def get_audience_insights(
         }
     ]
     
-    demographics = await db.analytics.aggregate(demographics_pipeline).to_list(None)
+    demographics = await (await db.analytics.aggregate(demographics_pipeline)).to_list(None)
     
     # Geographic performance
     geographic_pipeline = [
@@ -422,7 +423,7 @@ async def get_audience_insights(
         {"$limit": 20}
     ]
     
-    geographic = await db.analytics.aggregate(geographic_pipeline).to_list(None)
+    geographic = await (await db.analytics.aggregate(geographic_pipeline)).to_list(None)
     
     # Device/Platform breakdown
     device_pipeline = [
@@ -441,7 +442,7 @@ async def get_audience_insights(
         }
     ]
     
-    devices = await db.analytics.aggregate(device_pipeline).to_list(None)
+    devices = await (await db.analytics.aggregate(device_pipeline)).to_list(None)
     
     # Time-based engagement
     hourly_pipeline = [
@@ -465,7 +466,7 @@ async def get_audience_insights(
         {"$sort": {"_id": 1}}
     ]
     
-    hourly_engagement = await db.analytics.aggregate(hourly_pipeline).to_list(None)
+    hourly_engagement = await (await db.analytics.aggregate(hourly_pipeline)).to_list(None)
     
     return {
         "dateRange": {
@@ -483,10 +484,10 @@ async def get_audience_insights(
 
 @router.get("/conversion-funnel")
 async def get_conversion_funnel(
-    current_user_id: str = Depends(get_current_user_id),
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
     campaign_id: Optional[str] = Query(None),
     date_range: str = Query("30d", regex="^(7d|30d|90d)$"),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    db: AsyncDatabase = Depends(get_db)
 ):
     """
     🎯 **Conversion Funnel Analysis**
@@ -507,7 +508,7 @@ async def get_conversion_funnel(
     
     # Build query
     query = {
-        "userId": ObjectId(current_user_id),
+        "userId": current_user_oid,
         "timestamp": {"$gte": start_date, "$lte": now}
     }
     
@@ -561,7 +562,7 @@ async def get_conversion_funnel(
         }
     ]
     
-    funnel_result = await db.analytics.aggregate(funnel_pipeline).to_list(1)
+    funnel_result = await (await db.analytics.aggregate(funnel_pipeline)).to_list(1)
     funnel_data = funnel_result[0] if funnel_result else {
         "totalImpressions": 0,
         "totalClicks": 0,
@@ -627,12 +628,12 @@ async def get_conversion_funnel(
 
 @router.get("/export-report")
 async def export_analytics_report(
-    current_user_id: str = Depends(get_current_user_id),
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
     report_type: str = Query("campaign", regex="^(campaign|ad|audience|funnel)$"),
     date_range: str = Query("30d", regex="^(7d|30d|90d|1y)$"),
     format: str = Query("json", regex="^(json|csv)$"),
     campaign_id: Optional[str] = Query(None),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    db: AsyncDatabase = Depends(get_db)
 ):
     """
     📄 **Export Analytics Report**
@@ -663,7 +664,7 @@ async def export_analytics_report(
     
     # Build base query
     query = {
-        "userId": ObjectId(current_user_id),
+        "userId": current_user_oid,
         "createdAt": {"$gte": start_date, "$lte": now}
     }
     
@@ -2,14 +2,19 @@
 Authentication API routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Response
+from fastapi.responses import ORJSONResponse
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo import ReturnDocument
 from datetime import datetime, timedelta
 from typing import Dict, Any
+import asyncio
 import logging
+import orjson
+from bson import ObjectId
 
 from app.database import get_db
-from app.cache import CacheManager, CacheKeys
+from app.cache import CacheManager, CacheKeys, get_cache, run_in_background
 from app.schemas.auth import (
     LoginRequest, LoginResponse, RegisterRequest, RegisterResponse,
     RefreshTokenRequest, RefreshTokenResponse, ForgotPasswordRequest,
@@ -17,24 +22,51 @@ from app.schemas.auth import (
     ChangePasswordRequest, ChangePasswordResponse, VerifyEmailRequest,
     VerifyEmailResponse, PasswordStrengthCheck, PasswordStrengthResponse
 )
-from app.models.user import UserCreate, UserInDB, UserResponse, Subscription, UserPreferences, ApiUsage
+from app.models.user import (
+    UserCreate, UserInDB, UserResponse, USER_PROFILE_PROJECTION, USER_CREDENTIALS_PROJECTION
+)
 from app.utils.security import (
-    verify_password, get_password_hash, create_access_token, create_refresh_token,
-    verify_token, generate_password_reset_token, verify_password_reset_token,
-    generate_verification_token, verify_email_token, get_current_user_id,
+    averify_password, aget_password_hash, create_access_token, create_token_pair,
+    verify_token_async, has_token_type, generate_password_reset_token, verify_password_reset_token,
+    generate_verification_token, verify_email_token, get_current_user_id, get_current_user_oid,
     validate_password_strength
 )
 from app.config import settings
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 logger = logging.getLogger(__name__)
 
+# Static parts of a new user's document (read-only templates, merged per signup)
+DEFAULT_SUBSCRIPTION = {
+    "plan": "free",
+    "status": "active",
+    "endDate": None,
+    "features": ["basic_analytics", "campaign_management"]
+}
+
+DEFAULT_PREFERENCES = {
+    "theme": "light",
+    "language": "en",
+    "notifications": {
+        "email": True,
+        "push": True,
+        "sms": False
+    },
+    "defaultCurrency": "USD"
+}
+
+DEFAULT_API_USAGE = {
+    "adsGenerated": 0,
+    "apiCallsThisMonth": 0,
+    "quotaLimit": settings.AI_GENERATION_QUOTA_FREE
+}
+
 @router.post("/register", response_model=RegisterResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: RegisterRequest,
     background_tasks: BackgroundTasks,
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     🚀 **Register New User**
@@ -55,6 +87,13 @@ async def register(
     - Success message
     """
     
+    # Reject known emails from cache before touching the database
+    if await cache.exists(CacheKeys.user_exists(user_data.email)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    
     # Check if user already exists
     existing_user = await db.users.find_one({
         "$or": [
@@ -65,6 +104,7 @@ async def register(
     
     if existing_user:
         if existing_user["email"] == user_data.email:
+            await cache.set(CacheKeys.user_exists(user_data.email), 1, ttl=86400)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
@@ -93,31 +133,20 @@ async def register(
         "email": user_data.email,
         "username": user_data.username,
         "fullName": user_data.fullName,
-        "passwordHash": get_password_hash(user_data.password),
+        "passwordHash": await aget_password_hash(user_data.password),
         "avatar": None,
         "role": "user",
+        # Nested containers are copied too, so no document ever shares state with the templates
         "subscription": {
-            "plan": "free",
-            "status": "active", 
-            "startDate": now,
-            "endDate": None,
-            "features": ["basic_analytics", "campaign_management"]
+            **DEFAULT_SUBSCRIPTION,
+            "features": list(DEFAULT_SUBSCRIPTION["features"]),
+            "startDate": now
         },
         "preferences": {
-            "theme": "light",
-            "language": "en",
-            "notifications": {
-                "email": True,
-                "push": True,
-                "sms": False
-            },
-            "defaultCurrency": "USD"
-        },
-        "apiUsage": {
-            "adsGenerated": 0,
-            "apiCallsThisMonth": 0,
-            "quotaLimit": settings.AI_GENERATION_QUOTA_FREE
+            **DEFAULT_PREFERENCES,
+            "notifications": {**DEFAULT_PREFERENCES["notifications"]}
         },
+        "apiUsage": {**DEFAULT_API_USAGE},
         "createdAt": now,
         "updatedAt": now,
         "lastLogin": now,
@@ -130,49 +159,43 @@ async def register(
     user_id = str(result.inserted_id)
     
     # Generate tokens
-    access_token = create_access_token(data={"sub": user_id})
-    refresh_token = create_refresh_token(data={"sub": user_id})
+    access_token, refresh_token = create_token_pair({"sub": user_id})
     
-    # Generate verification token and send email (background task)
+    # Generate verification token and queue the email for an out-of-process worker
     verification_token = generate_verification_token(user_data.email)
-    # background_tasks.add_task(send_verification_email, user_data.email, verification_token)
+    await cache.add_to_stream(
+        CacheKeys.email_verification_stream(),
+        {"email": user_data.email, "token": verification_token},
+        maxlen=100000
+    )
     
-    # Cache user data
-    user_doc["id"] = user_id
-    await cache.set(CacheKeys.user_profile(user_id), user_doc, ttl=3600)
+    # Create response (the document was just built from validated input)
+    user_response = UserResponse.from_document(user_id, user_doc)
     
-    # Create response
-    user_response = UserResponse(
-        id=user_id,
-        email=user_data.email,
-        username=user_data.username,
-        fullName=user_data.fullName,
-        avatar=None,
-        role="user",
-        subscription=Subscription(**user_doc["subscription"]),
-        preferences=UserPreferences(**user_doc["preferences"]),
-        apiUsage=ApiUsage(**user_doc["apiUsage"]),
-        createdAt=now,
-        updatedAt=now,
-        lastLogin=now,
-        isVerified=False,
-        isActive=True
-    )
+    # Cache the rendered profile after the response has been sent
+    user_json = user_response.model_dump_json()
+    background_tasks.add_task(cache.set, CacheKeys.user_profile(user_id), user_json, ttl=3600)
+    background_tasks.add_task(cache.set, CacheKeys.user_exists(user_data.email), 1, ttl=86400)
     
     logger.info(f"New user registered: {user_data.email}")
     
-    return RegisterResponse(
-        message="Account created successfully. Please check your email for verification.",
-        user=user_response,
-        access_token=access_token,
-        refresh_token=refresh_token
+    # Embed the already-rendered profile instead of serializing the user twice
+    return ORJSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content={
+            "message": "Account created successfully. Please check your email for verification.",
+            "user": orjson.Fragment(user_json),
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "token_type": "bearer"
+        }
     )
 
 @router.post("/login", response_model=LoginResponse)
 async def login(
     credentials: LoginRequest,
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     🔐 **User Login**
@@ -192,65 +215,58 @@ async def login(
     - Token expiration info
     """
     
-    # Find user by email
-    user_doc = await db.users.find_one({"email": credentials.email})
+    # Find user by email (credentials only - the profile is fetched by the update below)
+    credentials_doc = await db.users.find_one(
+        {"email": credentials.email},
+        USER_CREDENTIALS_PROJECTION
+    )
     
-    if not user_doc or not verify_password(credentials.password, user_doc["passwordHash"]):
+    if not credentials_doc or not await averify_password(credentials.password, credentials_doc["passwordHash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    if not user_doc["isActive"]:
+    if not credentials_doc["isActive"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Account is deactivated"
         )
     
-    # Update last login
-    user_id = str(user_doc["_id"])
+    # Update last login and fetch the updated profile in one round trip,
+    # signing the tokens while the update is in flight
+    user_id = str(credentials_doc["_id"])
     now = datetime.utcnow()
-    await db.users.update_one(
-        {"_id": user_doc["_id"]},
-        {"$set": {"lastLogin": now, "updatedAt": now}}
-    )
+    update_task = asyncio.ensure_future(db.users.find_one_and_update(
+        {"_id": credentials_doc["_id"]},
+        {"$set": {"lastLogin": now, "updatedAt": now}},
+        projection=USER_PROFILE_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    ))
     
     # Generate tokens
-    access_token = create_access_token(data={"sub": user_id})
-    refresh_token = create_refresh_token(data={"sub": user_id})
+    access_token, refresh_token = create_token_pair({"sub": user_id})
     
-    # Cache user profile
-    user_doc["id"] = user_id
-    user_doc["lastLogin"] = now
-    await cache.set(CacheKeys.user_profile(user_id), user_doc, ttl=3600)
+    user_doc = await update_task
     
     # Create response
-    user_response = UserResponse(
-        id=user_id,
-        email=user_doc["email"],
-        username=user_doc["username"],
-        fullName=user_doc["fullName"],
-        avatar=user_doc.get("avatar"),
-        role=user_doc["role"],
-        subscription=Subscription(**user_doc["subscription"]),
-        preferences=UserPreferences(**user_doc["preferences"]),
-        apiUsage=ApiUsage(**user_doc["apiUsage"]),
-        createdAt=user_doc["createdAt"],
-        updatedAt=now,
-        lastLogin=now,
-        isVerified=user_doc["isVerified"],
-        isActive=user_doc["isActive"]
-    )
+    user_response = UserResponse.from_document(user_id, user_doc)
+    
+    # Cache the rendered profile without holding up the response
+    user_json = user_response.model_dump_json()
+    run_in_background(cache.set(CacheKeys.user_profile(user_id), user_json, ttl=3600))
     
     logger.info(f"User logged in: {credentials.email}")
     
-    return LoginResponse(
-        access_token=access_token,
-        refresh_token=refresh_token,
-        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        user=user_response
-    )
+    # Embed the already-rendered profile instead of serializing the user twice
+    return ORJSONResponse(content={
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "user": orjson.Fragment(user_json)
+    })
 
 @router.post("/refresh", response_model=RefreshTokenResponse)
 async def refresh_token(token_data: RefreshTokenRequest):
@@ -261,8 +277,8 @@ async def refresh_token(token_data: RefreshTokenRequest):
     """
     
     try:
-        payload = verify_token(token_data.refresh_token)
-        if payload.get("type") != "refresh":
+        payload = await verify_token_async(token_data.refresh_token)
+        if not has_token_type(payload, "refresh"):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid refresh token"
@@ -292,8 +308,9 @@ async def refresh_token(token_data: RefreshTokenRequest):
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     👤 **Get Current User Profile**
@@ -301,14 +318,16 @@ async def get_current_user(
     Retrieve current authenticated user's profile information.
     """
     
-    # Try cache first
-    cached_user = await cache.get(CacheKeys.user_profile(current_user_id))
+    # Try cache first - the cached value is already the rendered response body
+    cached_user = await cache.get_raw(CacheKeys.user_profile(current_user_id), ttl=3600)
     if cached_user:
-        return UserResponse(**cached_user)
+        return Response(content=cached_user, media_type="application/json")
     
     # Get from database
-    from bson import ObjectId
-    user_doc = await db.users.find_one({"_id": ObjectId(current_user_id)})
+    user_doc = await db.users.find_one(
+        {"_id": current_user_oid},
+        USER_PROFILE_PROJECTION
+    )
     
     if not user_doc:
         raise HTTPException(
@@ -316,26 +335,12 @@ async def get_current_user(
             detail="User not found"
         )
     
-    # Cache user data
-    user_doc["id"] = current_user_id
-    await cache.set(CacheKeys.user_profile(current_user_id), user_doc, ttl=3600)
-    
-    return UserResponse(
-        id=current_user_id,
-        email=user_doc["email"],
-        username=user_doc["username"],
-        fullName=user_doc["fullName"],
-        avatar=user_doc.get("avatar"),
-        role=user_doc["role"],
-        subscription=Subscription(**user_doc["subscription"]),
-        preferences=UserPreferences(**user_doc["preferences"]),
-        apiUsage=ApiUsage(**user_doc["apiUsage"]),
-        createdAt=user_doc["createdAt"],
-        updatedAt=user_doc["updatedAt"],
-        lastLogin=user_doc.get("lastLogin"),
-        isVerified=user_doc["isVerified"],
-        isActive=user_doc["isActive"]
-    )
+    user_response = UserResponse.from_document(current_user_id, user_doc)
+    
+    # Cache the rendered profile without holding up the response
+    run_in_background(cache.set(CacheKeys.user_profile(current_user_id), user_response.model_dump_json(), ttl=3600))
+    
+    return user_response
 
 @router.post("/check-password-strength", response_model=PasswordStrengthResponse)
 async def check_password_strength(password_data: PasswordStrengthCheck):
@@ -351,7 +356,7 @@ async def check_password_strength(password_data: PasswordStrengthCheck):
 @router.post("/logout")
 async def logout(
     current_user_id: str = Depends(get_current_user_id),
-    cache: CacheManager = Depends()
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     👋 **User Logout**
@@ -2,29 +2,186 @@
 Campaign Management API routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, Request, Response
+from fastapi.responses import ORJSONResponse
+from pymongo.asynchronous.database import AsyncDatabase
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
+import asyncio
+import hashlib
 import logging
+import orjson
 from bson import ObjectId
 
 from app.database import get_db
-from app.cache import CacheManager, CacheKeys
-from app.models.campaign import CampaignCreate, CampaignUpdate, CampaignResponse, CampaignListResponse
-from app.utils.security import get_current_user_id
+from app.cache import CacheManager, CacheKeys, get_cache
+from app.models.campaign import CampaignCreate, CampaignUpdate, CAMPAIGN_RESPONSE_PROJECTION
+from app.utils.security import get_current_user_id, get_current_user_oid
 from app.config import settings
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 logger = logging.getLogger(__name__)
 
-@router.post("/", response_model=CampaignResponse, status_code=status.HTTP_201_CREATED)
+# Static parts of a new campaign's document (copied per campaign)
+DEFAULT_CAMPAIGN_ANALYTICS = {
+    "impressions": 0,
+    "clicks": 0,
+    "conversions": 0,
+    "spent": 0.0,
+    "ctr": 0.0,
+    "cpc": 0.0,
+    "cpa": 0.0,
+    "roas": 0.0
+}
+
+DEFAULT_CAMPAIGN_OPTIMIZATION = {
+    "autoOptimize": True,
+    "bidStrategy": "auto",
+    "targetCpa": None,
+    "targetRoas": None
+}
+
+# Maximum campaigns per subscription plan
+CAMPAIGN_LIMITS = {
+    "free": 3,
+    "basic": 10,
+    "professional": 50,
+    "enterprise": 1000
+}
+
+# Analytics look-back windows ("all" starts at the campaign's creation)
+ANALYTICS_DATE_RANGES = {
+    "1d": timedelta(days=1),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+    "90d": timedelta(days=90)
+}
+
+# Rolled-up days this recent are re-merged on every refresh so late-arriving events are counted
+ANALYTICS_ROLLUP_LATE_WINDOW = timedelta(days=3)
+# Minimum gap between background rollup refreshes of one campaign
+ANALYTICS_ROLLUP_REFRESH_INTERVAL = timedelta(minutes=15)
+
+def _campaign_to_dict(campaign_doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a stored campaign document into its API response without re-validating it"""
+    return {
+        "id": str(campaign_doc["_id"]),
+        "userId": str(campaign_doc["userId"]),
+        "name": campaign_doc["name"],
+        "description": campaign_doc["description"],
+        "objective": campaign_doc["objective"],
+        "status": campaign_doc["status"],
+        "budget": campaign_doc["budget"],
+        "schedule": campaign_doc.get("schedule"),
+        "targeting": campaign_doc["targeting"],
+        "creativeRequirements": campaign_doc.get("creativeRequirements"),
+        "platforms": campaign_doc["platforms"],
+        "tags": campaign_doc.get("tags", []),
+        "analytics": campaign_doc["analytics"],
+        "optimization": campaign_doc.get("optimization", {}),
+        "createdAt": campaign_doc["createdAt"],
+        "updatedAt": campaign_doc["updatedAt"],
+        "lastOptimized": campaign_doc.get("lastOptimized")
+    }
+
+def _conditional_json(request: Request, content: Any) -> Response:
+    """Render content as JSON, answering 304 when the client already holds the same body"""
+    body = orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=5"}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def get_campaign_oid(campaign_id: str) -> ObjectId:
+    """Parse the campaign_id path parameter once per request"""
+    if not ObjectId.is_valid(campaign_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid campaign ID"
+        )
+    return ObjectId(campaign_id)
+
+async def _raise_status_conflict(db: AsyncDatabase, campaign_oid: ObjectId, user_oid: ObjectId, detail: str):
+    """Explain a conditional campaign write that matched nothing: missing (404) or wrong status (400)"""
+    campaign_doc = await db.campaigns.find_one(
+        {"_id": campaign_oid, "userId": user_oid},
+        {"_id": 1}
+    )
+    
+    if not campaign_doc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Campaign not found"
+        )
+    
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=detail
+    )
+
+async def _aggregate_to_list(collection, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Run an aggregation and collect its results"""
+    return await (await collection.aggregate(pipeline)).to_list(None)
+
+async def _roll_up_daily_analytics(db: AsyncDatabase, campaign_oid: ObjectId, since: datetime, until: datetime):
+    """Fold a campaign's raw analytics events in [since, until) into per-day analytics_daily documents"""
+    rollup_pipeline = [
+        {"$match": {"campaignId": campaign_oid, "timestamp": {"$gte": since, "$lt": until}}},
+        {
+            "$group": {
+                "_id": {"$dateTrunc": {"date": "$timestamp", "unit": "day"}},
+                "impressions": {"$sum": "$impressions"},
+                "clicks": {"$sum": "$clicks"},
+                "conversions": {"$sum": "$conversions"},
+                "spent": {"$sum": "$spent"}
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "campaignId": {"$literal": campaign_oid},
+                "day": "$_id",
+                "impressions": 1,
+                "clicks": 1,
+                "conversions": 1,
+                "spent": 1
+            }
+        },
+        {
+            "$merge": {
+                "into": "analytics_daily",
+                "on": ["campaignId", "day"],
+                "whenMatched": "replace",
+                "whenNotMatched": "insert"
+            }
+        }
+    ]
+    await db.analytics.aggregate(rollup_pipeline)
+
+async def _refresh_daily_analytics(db: AsyncDatabase, campaign_oid: ObjectId, rolled_up_to: datetime, today: datetime):
+    """Background rollup: fold completed days up to today, re-merging the trailing late-event window"""
+    since = min(rolled_up_to, today - ANALYTICS_ROLLUP_LATE_WINDOW)
+    try:
+        await _roll_up_daily_analytics(db, campaign_oid, since, today)
+        await db.campaigns.update_one(
+            {"_id": campaign_oid},
+            {"$set": {"analyticsRolledUpTo": today, "analyticsRolledUpAt": datetime.utcnow()}}
+        )
+    except Exception as e:
+        logger.error(f"Analytics rollup failed for campaign {campaign_oid}: {e}")
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_campaign(
     campaign_data: CampaignCreate,
     background_tasks: BackgroundTasks,
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     🚀 **Create New Campaign**
@@ -46,30 +203,57 @@ async def create_campaign(
     - App Installs
     """
     
-    # Validate user subscription limits
-    user_doc = await db.users.find_one(
-        {"_id": ObjectId(current_user_id)},
-        {"subscription": 1, "apiUsage": 1}
-    )
-    
-    if not user_doc:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
+    # Serve the limit check from cache while the user is under quota
+    plan_key = CacheKeys.user_plan(current_user_id)
+    count_key = CacheKeys.user_campaign_count(current_user_id)
+    subscription_plan, campaign_count = await cache.get_many(plan_key, count_key)
+    
+    if (
+        subscription_plan is None
+        or campaign_count is None
+        or campaign_count >= CAMPAIGN_LIMITS.get(subscription_plan, 3)
+    ):
+        # Cache miss, or at the limit and worth re-verifying: fetch the user's
+        # plan and current campaign count in a single round trip
+        limits_pipeline = [
+            {"$match": {"_id": current_user_oid}},
+            {
+                "$lookup": {
+                    "from": "campaigns",
+                    "let": {"uid": "$_id"},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$eq": ["$userId", "$$uid"]}}},
+                        {"$count": "n"}
+                    ],
+                    "as": "campaignCounts"
+                }
+            },
+            {
+                "$project": {
+                    "subscription.plan": 1,
+                    "campaignCount": {"$ifNull": [{"$arrayElemAt": ["$campaignCounts.n", 0]}, 0]}
+                }
+            }
+        ]
+        user_result = await (await db.users.aggregate(limits_pipeline)).to_list(1)
+        
+        if not user_result:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        
+        user_doc = user_result[0]
+        campaign_count = user_doc["campaignCount"]
+        subscription_plan = user_doc["subscription"]["plan"]
+        # Awaited so the count is in place before the post-insert increment
+        await asyncio.gather(
+            cache.set(plan_key, subscription_plan, ttl=300),
+            cache.set(count_key, campaign_count, ttl=300)
         )
     
     # Check campaign limits based on subscription
-    campaign_count = await db.campaigns.count_documents({"userId": ObjectId(current_user_id)})
-    subscription_plan = user_doc["subscription"]["plan"]
-    
-    campaign_limits = {
-        "free": 3,
-        "basic": 10,
-        "professional": 50,
-        "enterprise": 1000
-    }
-    
-    if campaign_count >= campaign_limits.get(subscription_plan, 3):
+    if campaign_count >= CAMPAIGN_LIMITS.get(subscription_plan, 3):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"Campaign limit reached for {subscription_plan} plan"
@@ -77,34 +261,15 @@ async def create_campaign(
     
     # Create campaign document
     now = datetime.utcnow()
+    campaign_payload = campaign_data.model_dump()
     campaign_doc = {
-        "userId": ObjectId(current_user_id),
-        "name": campaign_data.name,
-        "description": campaign_data.description,
-        "objective": campaign_data.objective,
+        "userId": current_user_oid,
+        **campaign_payload,
         "status": "draft",
-        "budget": campaign_data.budget.dict(),
-        "schedule": campaign_data.schedule.dict() if campaign_data.schedule else None,
-        "targeting": campaign_data.targeting.dict(),
-        "creativeRequirements": campaign_data.creativeRequirements.dict() if campaign_data.creativeRequirements else None,
-        "platforms": campaign_data.platforms,
-        "tags": campaign_data.tags or [],
-        "analytics": {
-            "impressions": 0,
-            "clicks": 0,
-            "conversions": 0,
-            "spent": 0.0,
-            "ctr": 0.0,
-            "cpc": 0.0,
-            "cpa": 0.0,
-            "roas": 0.0
-        },
-        "optimization": {
-            "autoOptimize": True,
-            "bidStrategy": "auto",
-            "targetCpa": None,
-            "targetRoas": None
-        },
+        "creativeRequirements": campaign_payload.get("creativeRequirements"),
+        "tags": campaign_payload.get("tags") or [],
+        "analytics": DEFAULT_CAMPAIGN_ANALYTICS.copy(),
+        "optimization": DEFAULT_CAMPAIGN_OPTIMIZATION.copy(),
         "createdAt": now,
         "updatedAt": now,
         "lastOptimized": None
@@ -113,48 +278,35 @@ async def create_campaign(
     # Insert campaign
     result = await db.campaigns.insert_one(campaign_doc)
     campaign_id = str(result.inserted_id)
+    # INCRBY recreates an expired key from 0, which would under-count; on any
+    # mismatch drop the key so the next create re-reads the count from the DB
+    if await cache.increment(count_key, ttl=300) != campaign_count + 1:
+        await cache.delete(count_key)
     
-    # Cache campaign
+    # Cache campaign once the response is on its way
     campaign_doc["id"] = campaign_id
-    await cache.set(CacheKeys.campaign(campaign_id), campaign_doc, ttl=3600)
+    background_tasks.add_task(cache.set, CacheKeys.campaign(campaign_id), campaign_doc, ttl=3600)
     
     # Schedule AI optimization analysis (background task)
     # background_tasks.add_task(analyze_campaign_potential, campaign_id)
     
     logger.info(f"Campaign created: {campaign_id} by user {current_user_id}")
     
-    return CampaignResponse(
-        id=campaign_id,
-        userId=current_user_id,
-        name=campaign_data.name,
-        description=campaign_data.description,
-        objective=campaign_data.objective,
-        status="draft",
-        budget=campaign_data.budget,
-        schedule=campaign_data.schedule,
-        targeting=campaign_data.targeting,
-        creativeRequirements=campaign_data.creativeRequirements,
-        platforms=campaign_data.platforms,
-        tags=campaign_data.tags or [],
-        analytics=campaign_doc["analytics"],
-        optimization=campaign_doc["optimization"],
-        createdAt=now,
-        updatedAt=now,
-        lastOptimized=None
-    )
+    return _campaign_to_dict(campaign_doc)
 
-@router.get("/", response_model=CampaignListResponse)
+@router.get("/")
 async def get_campaigns(
-    current_user_id: str = Depends(get_current_user_id),
-    status_filter: Optional[str] = Query(None, regex="^(draft|active|paused|completed|archived)$"),
+    request: Request,
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    status_filter: Optional[Literal["draft", "active", "paused", "completed", "archived"]] = Query(None),
     objective_filter: Optional[str] = Query(None),
     platform_filter: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    sort_by: str = Query("createdAt", regex="^(createdAt|updatedAt|name|status|spent)$"),
-    sort_order: str = Query("desc", regex="^(asc|desc)$"),
-    limit: int = Query(default=20, le=100),
+    sort_by: Literal["createdAt", "updatedAt", "name", "status", "spent"] = Query("createdAt"),
+    sort_order: Literal["asc", "desc"] = Query("desc"),
+    limit: int = Query(default=20, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    db: AsyncDatabase = Depends(get_db)
 ):
     """
     📋 **Get User Campaigns**
@@ -176,7 +328,7 @@ async def get_campaigns(
     """
     
     # Build query
-    query = {"userId": ObjectId(current_user_id)}
+    query = {"userId": current_user_oid}
     
     if status_filter:
         query["status"] = status_filter
@@ -188,57 +340,50 @@ async def get_campaigns(
         query["platforms"] = platform_filter
     
     if search:
-        query["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}}
-        ]
+        # Served by the campaigns text index rather than an unanchored regex scan
+        query["$text"] = {"$search": search}
     
     # Build sort
     sort_direction = -1 if sort_order == "desc" else 1
     sort_field = "analytics.spent" if sort_by == "spent" else sort_by
     
-    # Get total count
-    total = await db.campaigns.count_documents(query)
-    
-    # Get campaigns
-    campaigns_cursor = db.campaigns.find(query).sort(sort_field, sort_direction).skip(offset).limit(limit)
-    
-    campaigns = []
-    async for campaign_doc in campaigns_cursor:
-        campaigns.append(CampaignResponse(
-            id=str(campaign_doc["_id"]),
-            userId=str(campaign_doc["userId"]),
-            name=campaign_doc["name"],
-            description=campaign_doc["description"],
-            objective=campaign_doc["objective"],
-            status=campaign_doc["status"],
-            budget=campaign_doc["budget"],
-            schedule=campaign_doc.get("schedule"),
-            targeting=campaign_doc["targeting"],
-            creativeRequirements=campaign_doc.get("creativeRequirements"),
-            platforms=campaign_doc["platforms"],
-            tags=campaign_doc.get("tags", []),
-            analytics=campaign_doc["analytics"],
-            optimization=campaign_doc.get("optimization", {}),
-            createdAt=campaign_doc["createdAt"],
-            updatedAt=campaign_doc["updatedAt"],
-            lastOptimized=campaign_doc.get("lastOptimized")
-        ))
-    
-    return CampaignListResponse(
-        campaigns=campaigns,
-        total=total,
-        limit=limit,
-        offset=offset,
-        hasMore=offset + len(campaigns) < total
-    )
+    # Count and page over the same match in a single round trip
+    pipeline = [
+        {"$match": query},
+        {
+            "$facet": {
+                "total": [{"$count": "n"}],
+                "page": [
+                    {"$sort": {sort_field: sort_direction}},
+                    {"$skip": offset},
+                    {"$limit": limit},
+                    {"$project": CAMPAIGN_RESPONSE_PROJECTION}
+                ]
+            }
+        }
+    ]
+    result = (await (await db.campaigns.aggregate(pipeline)).to_list(1))[0]
+    
+    total = result["total"][0]["n"] if result["total"] else 0
+    campaigns = [_campaign_to_dict(campaign_doc) for campaign_doc in result["page"]]
+    
+    return _conditional_json(request, {
+        "campaigns": campaigns,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "hasMore": offset + len(campaigns) < total
+    })
 
-@router.get("/{campaign_id}", response_model=CampaignResponse)
+@router.get("/{campaign_id}")
 async def get_campaign(
     campaign_id: str,
+    request: Request,
+    campaign_oid: ObjectId = Depends(get_campaign_oid),
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     📄 **Get Campaign Details**
@@ -249,12 +394,12 @@ async def get_campaign(
     # Try cache first
     cached_campaign = await cache.get(CacheKeys.campaign(campaign_id))
     if cached_campaign and cached_campaign.get("userId") == current_user_id:
-        return CampaignResponse(**cached_campaign)
+        return _conditional_json(request, _campaign_to_dict(cached_campaign))
     
     # Get from database
     campaign_doc = await db.campaigns.find_one({
-        "_id": ObjectId(campaign_id),
-        "userId": ObjectId(current_user_id)
+        "_id": campaign_oid,
+        "userId": current_user_oid
     })
     
     if not campaign_doc:
@@ -268,33 +413,18 @@ async def get_campaign(
     campaign_doc["userId"] = current_user_id
     await cache.set(CacheKeys.campaign(campaign_id), campaign_doc, ttl=3600)
     
-    return CampaignResponse(
-        id=campaign_id,
-        userId=current_user_id,
-        name=campaign_doc["name"],
-        description=campaign_doc["description"],
-        objective=campaign_doc["objective"],
-        status=campaign_doc["status"],
-        budget=campaign_doc["budget"],
-        schedule=campaign_doc.get("schedule"),
-        targeting=campaign_doc["targeting"],
-        creativeRequirements=campaign_doc.get("creativeRequirements"),
-        platforms=campaign_doc["platforms"],
-        tags=campaign_doc.get("tags", []),
-        analytics=campaign_doc["analytics"],
-        optimization=campaign_doc.get("optimization", {}),
-        createdAt=campaign_doc["createdAt"],
-        updatedAt=campaign_doc["updatedAt"],
-        lastOptimized=campaign_doc.get("lastOptimized")
-    )
+    return _conditional_json(request, _campaign_to_dict(campaign_doc))
 
-@router.put("/{campaign_id}", response_model=CampaignResponse)
+@router.put("/{campaign_id}")
 async def update_campaign(
     campaign_id: str,
     campaign_update: CampaignUpdate,
+    background_tasks: BackgroundTasks,
+    campaign_oid: ObjectId = Depends(get_campaign_oid),
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     ✏️ **Update Campaign**
@@ -311,8 +441,8 @@ async def update_campaign(
     
     # Check if campaign exists and belongs to user
     existing_campaign = await db.campaigns.find_one({
-        "_id": ObjectId(campaign_id),
-        "userId": ObjectId(current_user_id)
+        "_id": campaign_oid,
+        "userId": current_user_oid
     })
     
     if not existing_campaign:
@@ -325,7 +455,7 @@ async def update_campaign(
     if existing_campaign["status"] == "active":
         # Only allow certain fields to be updated for active campaigns
         restricted_fields = ["budget", "schedule", "targeting"]
-        update_dict = campaign_update.dict(exclude_unset=True)
+        update_dict = campaign_update.model_dump(exclude_unset=True)
         for field in restricted_fields:
             if field in update_dict:
                 raise HTTPException(
@@ -334,55 +464,37 @@ async def update_campaign(
                 )
     
     # Prepare update data
-    update_data = campaign_update.dict(exclude_unset=True)
+    update_data = campaign_update.model_dump(exclude_unset=True)
     if update_data:
-        update_data["updatedAt"] = datetime.utcnow()
-        
-        # Update campaign
+        # Update campaign (updatedAt is stamped server-side)
         await db.campaigns.update_one(
-            {"_id": ObjectId(campaign_id)},
-            {"$set": update_data}
+            {"_id": campaign_oid},
+            {"$set": update_data, "$currentDate": {"updatedAt": True}}
         )
     
     # Get updated campaign
     updated_campaign = await db.campaigns.find_one({
-        "_id": ObjectId(campaign_id),
-        "userId": ObjectId(current_user_id)
+        "_id": campaign_oid,
+        "userId": current_user_oid
     })
     
     # Update cache
     updated_campaign["id"] = campaign_id
     updated_campaign["userId"] = current_user_id
-    await cache.set(CacheKeys.campaign(campaign_id), updated_campaign, ttl=3600)
+    background_tasks.add_task(cache.set, CacheKeys.campaign(campaign_id), updated_campaign, ttl=3600)
     
     logger.info(f"Campaign updated: {campaign_id} by user {current_user_id}")
     
-    return CampaignResponse(
-        id=campaign_id,
-        userId=current_user_id,
-        name=updated_campaign["name"],
-        description=updated_campaign["description"],
-        objective=updated_campaign["objective"],
-        status=updated_campaign["status"],
-        budget=updated_campaign["budget"],
-        schedule=updated_campaign.get("schedule"),
-        targeting=updated_campaign["targeting"],
-        creativeRequirements=updated_campaign.get("creativeRequirements"),
-        platforms=updated_campaign["platforms"],
-        tags=updated_campaign.get("tags", []),
-        analytics=updated_campaign["analytics"],
-        optimization=updated_campaign.get("optimization", {}),
-        createdAt=updated_campaign["createdAt"],
-        updatedAt=updated_campaign["updatedAt"],
-        lastOptimized=updated_campaign.get("lastOptimized")
-    )
+    return _campaign_to_dict(updated_campaign)
 
 @router.post("/{campaign_id}/start")
 async def start_campaign(
     campaign_id: str,
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    background_tasks: BackgroundTasks,
+    campaign_oid: ObjectId = Depends(get_campaign_oid),
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     ▶️ **Start Campaign**
@@ -390,51 +502,65 @@ async def start_campaign(
     Activate campaign and begin ad delivery.
     """
     
-    # Check campaign exists and belongs to user
-    campaign_doc = await db.campaigns.find_one({
-        "_id": ObjectId(campaign_id),
-        "userId": ObjectId(current_user_id)
-    })
+    # Load the campaign's status and whether it has a deliverable ad in one round trip
+    start_pipeline = [
+        {"$match": {"_id": campaign_oid, "userId": current_user_oid}},
+        {
+            "$lookup": {
+                "from": "ads",
+                "localField": "_id",
+                "foreignField": "campaignId",
+                "pipeline": [
+                    {"$match": {"status": {"$in": ["active", "approved"]}}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 1}}
+                ],
+                "as": "deliverableAds"
+            }
+        },
+        {"$project": {"status": 1, "hasAds": {"$gt": [{"$size": "$deliverableAds"}, 0]}}}
+    ]
+    start_result = await (await db.campaigns.aggregate(start_pipeline)).to_list(1)
     
-    if not campaign_doc:
+    if not start_result:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Campaign not found"
         )
     
-    if campaign_doc["status"] == "active":
+    if start_result[0]["status"] == "active":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Campaign is already active"
         )
     
-    # Check if campaign has ads
-    ad_count = await db.ads.count_documents({
-        "campaignId": ObjectId(campaign_id),
-        "status": {"$in": ["active", "approved"]}
-    })
-    
-    if ad_count == 0:
+    if not start_result[0]["hasAds"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Campaign must have at least one active ad before starting"
         )
     
-    # Update campaign status
-    now = datetime.utcnow()
-    await db.campaigns.update_one(
-        {"_id": ObjectId(campaign_id)},
+    # Update campaign status, unless it was started concurrently (timestamps stamped server-side)
+    result = await db.campaigns.update_one(
         {
-            "$set": {
-                "status": "active",
-                "updatedAt": now,
-                "schedule.startDate": now
-            }
+            "_id": campaign_oid,
+            "userId": current_user_oid,
+            "status": {"$ne": "active"}
+        },
+        {
+            "$set": {"status": "active"},
+            "$currentDate": {"updatedAt": True, "schedule.startDate": True}
         }
     )
     
-    # Clear cache
-    await cache.delete(CacheKeys.campaign(campaign_id))
+    if result.matched_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Campaign is already active"
+        )
+    
+    # Clear cache once the response is on its way
+    background_tasks.add_task(cache.delete, CacheKeys.campaign(campaign_id))
     
     logger.info(f"Campaign started: {campaign_id}")
     
@@ -443,9 +569,11 @@ async def start_campaign(
 @router.post("/{campaign_id}/pause")
 async def pause_campaign(
     campaign_id: str,
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    background_tasks: BackgroundTasks,
+    campaign_oid: ObjectId = Depends(get_campaign_oid),
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     ⏸️ **Pause Campaign**
@@ -453,37 +581,24 @@ async def pause_campaign(
     Temporarily pause campaign ad delivery.
     """
     
-    # Check campaign exists and belongs to user
-    campaign_doc = await db.campaigns.find_one({
-        "_id": ObjectId(campaign_id),
-        "userId": ObjectId(current_user_id)
-    })
-    
-    if not campaign_doc:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Campaign not found"
-        )
-    
-    if campaign_doc["status"] != "active":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Only active campaigns can be paused"
-        )
-    
-    # Update campaign status
-    await db.campaigns.update_one(
-        {"_id": ObjectId(campaign_id)},
+    # Update campaign status, provided it exists, belongs to the user and is active
+    result = await db.campaigns.update_one(
         {
-            "$set": {
-                "status": "paused",
-                "updatedAt": datetime.utcnow()
-            }
+            "_id": campaign_oid,
+            "userId": current_user_oid,
+            "status": "active"
+        },
+        {
+            "$set": {"status": "paused"},
+            "$currentDate": {"updatedAt": True}
         }
     )
     
-    # Clear cache
-    await cache.delete(CacheKeys.campaign(campaign_id))
+    if result.matched_count == 0:
+        await _raise_status_conflict(db, campaign_oid, current_user_oid, "Only active campaigns can be paused")
+    
+    # Clear cache once the response is on its way
+    background_tasks.add_task(cache.delete, CacheKeys.campaign(campaign_id))
     
     logger.info(f"Campaign paused: {campaign_id}")
     
@@ -492,9 +607,12 @@ async def pause_campaign(
 @router.delete("/{campaign_id}")
 async def delete_campaign(
     campaign_id: str,
+    background_tasks: BackgroundTasks,
+    campaign_oid: ObjectId = Depends(get_campaign_oid),
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    db: AsyncDatabase = Depends(get_db),
+    cache: CacheManager = Depends(get_cache)
 ):
     """
     🗑️ **Delete Campaign**
@@ -502,32 +620,25 @@ async def delete_campaign(
     Permanently delete campaign and all associated ads.
     """
     
-    # Check campaign exists and belongs to user
-    campaign_doc = await db.campaigns.find_one({
-        "_id": ObjectId(campaign_id),
-        "userId": ObjectId(current_user_id)
+    # Delete campaign, provided it exists, belongs to the user and isn't active
+    result = await db.campaigns.delete_one({
+        "_id": campaign_oid,
+        "userId": current_user_oid,
+        "status": {"$ne": "active"}
     })
     
-    if not campaign_doc:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Campaign not found"
-        )
-    
-    if campaign_doc["status"] == "active":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot delete active campaign. Pause it first."
+    if result.deleted_count == 0:
+        await _raise_status_conflict(
+            db, campaign_oid, current_user_oid,
+            "Cannot delete active campaign. Pause it first."
         )
     
-    # Delete all associated ads first
-    await db.ads.delete_many({"campaignId": ObjectId(campaign_id)})
-    
-    # Delete campaign
-    await db.campaigns.delete_one({"_id": ObjectId(campaign_id)})
+    # Delete all associated ads off the request path
+    background_tasks.add_task(db.ads.delete_many, {"campaignId": campaign_oid})
     
-    # Clear cache
-    await cache.delete(CacheKeys.campaign(campaign_id))
+    # Clear cache (the campaign count is re-read from the database on next create)
+    background_tasks.add_task(cache.delete, CacheKeys.campaign(campaign_id))
+    background_tasks.add_task(cache.delete, CacheKeys.user_campaign_count(current_user_id))
     
     logger.info(f"Campaign deleted: {campaign_id}")
     
@@ -536,9 +647,11 @@ async def delete_campaign(
 @router.get("/{campaign_id}/analytics", response_model=Dict[str, Any])
 async def get_campaign_analytics(
     campaign_id: str,
-    current_user_id: str = Depends(get_current_user_id),
-    date_range: str = Query("7d", regex="^(1d|7d|30d|90d|all)$"),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    campaign_oid: ObjectId = Depends(get_campaign_oid),
+    current_user_oid: ObjectId = Depends(get_current_user_oid),
+    date_range: Literal["1d", "7d", "30d", "90d", "all"] = Query("7d"),
+    db: AsyncDatabase = Depends(get_db)
 ):
     """
     📊 **Get Campaign Analytics**
@@ -555,9 +668,9 @@ async def get_campaign_analytics(
     
     # Check campaign exists and belongs to user
     campaign_doc = await db.campaigns.find_one({
-        "_id": ObjectId(campaign_id),
-        "userId": ObjectId(current_user_id)
-    }, {"analytics": 1, "budget": 1, "createdAt": 1})
+        "_id": campaign_oid,
+        "userId": current_user_oid
+    }, {"analytics": 1, "budget": 1, "createdAt": 1, "analyticsRolledUpTo": 1, "analyticsRolledUpAt": 1})
     
     if not campaign_doc:
         raise HTTPException(
@@ -565,56 +678,66 @@ async def get_campaign_analytics(
             detail="Campaign not found"
         )
     
-    # Calculate date range
+    # Calculate date range (a rolling window ending now)
     now = datetime.utcnow()
-    if date_range == "1d":
-        start_date = now - timedelta(days=1)
-    elif date_range == "7d":
-        start_date = now - timedelta(days=7)
-    elif date_range == "30d":
-        start_date = now - timedelta(days=30)
-    elif date_range == "90d":
-        start_date = now - timedelta(days=90)
-    else:  # all
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if date_range == "all":
         start_date = campaign_doc["createdAt"]
+    else:
+        start_date = now - ANALYTICS_DATE_RANGES[date_range]
+    start_day = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    first_full_day = start_day if start_date == start_day else start_day + timedelta(days=1)
     
-    # Get detailed analytics from analytics collection
-    analytics_pipeline = [
+    # Rollups are refreshed after the response, never on the request path
+    rolled_up_to = campaign_doc.get("analyticsRolledUpTo") or campaign_doc["createdAt"].replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    rolled_up_at = campaign_doc.get("analyticsRolledUpAt")
+    if rolled_up_to < today or rolled_up_at is None or now - rolled_up_at >= ANALYTICS_ROLLUP_REFRESH_INTERVAL:
+        background_tasks.add_task(_refresh_daily_analytics, db, campaign_doc["_id"], rolled_up_to, today)
+    
+    # Whole days already rolled up come from analytics_daily; the partial first day of the
+    # window and everything past the watermark are aggregated from raw events per day
+    raw_ranges = [{"timestamp": {"$gte": max(rolled_up_to, first_full_day), "$lte": now}}]
+    if start_date < first_full_day:
+        raw_ranges.append({"timestamp": {"$gte": start_date, "$lt": first_full_day}})
+    raw_pipeline = [
+        {"$match": {"campaignId": campaign_doc["_id"], "$or": raw_ranges}},
         {
-            "$match": {
-                "campaignId": ObjectId(campaign_id),
-                "timestamp": {"$gte": start_date, "$lte": now}
+            "$group": {
+                "_id": {"$dateTrunc": {"date": "$timestamp", "unit": "day"}},
+                "impressions": {"$sum": "$impressions"},
+                "clicks": {"$sum": "$clicks"},
+                "conversions": {"$sum": "$conversions"},
+                "spent": {"$sum": "$spent"}
             }
         },
+        {"$project": {"_id": 0, "day": "$_id", "impressions": 1, "clicks": 1, "conversions": 1, "spent": 1}}
+    ]
+    daily_rollups, raw_days = await asyncio.gather(
+        db.analytics_daily.find(
+            {"campaignId": campaign_doc["_id"], "day": {"$gte": first_full_day, "$lt": rolled_up_to}},
+            {"_id": 0, "day": 1, "impressions": 1, "clicks": 1, "conversions": 1, "spent": 1}
+        ).to_list(None),
+        _aggregate_to_list(db.analytics, raw_pipeline)
+    )
+    
+    daily_metrics = [
         {
-            "$group": {
-                "_id": None,
-                "totalImpressions": {"$sum": "$impressions"},
-                "totalClicks": {"$sum": "$clicks"},
-                "totalConversions": {"$sum": "$conversions"},
-                "totalSpent": {"$sum": "$spent"},
-                "dailyMetrics": {
-                    "$push": {
-                        "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
-                        "impressions": "$impressions",
-                        "clicks": "$clicks",
-                        "conversions": "$conversions",
-                        "spent": "$spent"
-                    }
-                }
-            }
+            "date": day["day"].strftime("%Y-%m-%d"),
+            "impressions": day["impressions"],
+            "clicks": day["clicks"],
+            "conversions": day["conversions"],
+            "spent": day["spent"]
         }
+        for day in sorted(daily_rollups + raw_days, key=lambda day: day["day"])
     ]
     
-    # Execute analytics aggregation
-    analytics_result = await db.analytics.aggregate(analytics_pipeline).to_list(1)
-    
-    if analytics_result:
-        analytics_data = analytics_result[0]
-        total_impressions = analytics_data["totalImpressions"]
-        total_clicks = analytics_data["totalClicks"]
-        total_conversions = analytics_data["totalConversions"]
-        total_spent = analytics_data["totalSpent"]
+    if daily_metrics:
+        total_impressions = sum(day["impressions"] for day in daily_metrics)
+        total_clicks = sum(day["clicks"] for day in daily_metrics)
+        total_conversions = sum(day["conversions"] for day in daily_metrics)
+        total_spent = sum(day["spent"] for day in daily_metrics)
         
         # Calculate derived metrics
         ctr = (total_clicks / total_impressions * 100) if total_impressions > 0 else 0
@@ -656,5 +779,5 @@ async def get_campaign_analytics(
             "remaining": round(budget_total - total_spent, 2),
             "utilization": round(budget_utilization, 1)
         },
-        "dailyMetrics": analytics_result[0]["dailyMetrics"] if analytics_result else []
+        "dailyMetrics": daily_metrics
     }
\ No newline at end of file
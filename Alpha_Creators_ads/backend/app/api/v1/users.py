@@ -2,27 +2,62 @@
 User Management API routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi import APIRouter, HTTPException, status, Query, UploadFile, File, Response
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 from typing import List, Optional
 import logging
 from bson import ObjectId
 
-from app.database import get_db
-from app.cache import CacheManager, CacheKeys
-from app.models.user import UserResponse, UserUpdate, UserPreferences, Subscription, ApiUsage
-from app.utils.security import get_current_user_id, verify_password, get_password_hash
+from app.api.deps import Context, RequestContext
+from app.cache import CacheKeys
+from app.models.user import (
+    UserResponse, UserUpdate, UserPreferences, Subscription, ApiUsage, USER_PROFILE_PROJECTION
+)
+from app.utils.security import averify_password, aget_password_hash
 from app.schemas.auth import ChangePasswordRequest, ChangePasswordResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+def _activity_branch(user_oid: ObjectId, window: int, activity_type: str, label: str, title_field: str) -> List[dict]:
+    """Pipeline stages rendering a user's newest `window` documents of one collection as activity entries"""
+    return [
+        {"$match": {"userId": user_oid}},
+        # Cut each branch down via its (userId, updatedAt) index before the union
+        {"$sort": {"updatedAt": -1}},
+        {"$limit": window},
+        {
+            "$project": {
+                "_id": 0,
+                "type": {"$literal": activity_type},
+                "action": {
+                    "$cond": [{"$eq": ["$createdAt", "$updatedAt"]}, "created", "updated"]
+                },
+                "title": {"$concat": [label, f"${title_field}"]},
+                "status": 1,
+                "timestamp": "$updatedAt"
+            }
+        }
+    ]
+
+async def _update_cached_profile(ctx: RequestContext, fields: dict) -> None:
+    """Apply `fields` to the caller's user document and write the rendered profile through to cache"""
+    user_doc = await ctx.db.users.find_one_and_update(
+        {"_id": ctx.user_oid},
+        {"$set": fields},
+        projection=USER_PROFILE_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    
+    if user_doc:
+        user_response = UserResponse.from_document(ctx.user_id, user_doc)
+        await ctx.cache.set(CacheKeys.user_profile(ctx.user_id), user_response.model_dump_json(), ttl=3600)
+
 @router.get("/profile", response_model=UserResponse)
 async def get_user_profile(
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    ctx: Context
 ):
     """
     👤 **Get User Profile**
@@ -30,13 +65,14 @@ async def get_user_profile(
     Retrieve detailed user profile information.
     """
     
-    # Try cache first
-    cached_user = await cache.get(CacheKeys.user_profile(current_user_id))
+    # Try cache first; the cached value is already-rendered UserResponse JSON,
+    # so send it as-is instead of validating and re-serializing it
+    cached_user = await ctx.cache.get_raw(CacheKeys.user_profile(ctx.user_id), ttl=3600)
     if cached_user:
-        return UserResponse(**cached_user)
+        return Response(content=cached_user, media_type="application/json")
     
     # Get from database
-    user_doc = await db.users.find_one({"_id": ObjectId(current_user_id)})
+    user_doc = await ctx.db.users.find_one({"_id": ctx.user_oid}, USER_PROFILE_PROJECTION)
     
     if not user_doc:
         raise HTTPException(
@@ -44,33 +80,17 @@ async def get_user_profile(
             detail="User not found"
         )
     
-    # Cache user data
-    user_doc["id"] = current_user_id
-    await cache.set(CacheKeys.user_profile(current_user_id), user_doc, ttl=3600)
-    
-    return UserResponse(
-        id=current_user_id,
-        email=user_doc["email"],
-        username=user_doc["username"],
-        fullName=user_doc["fullName"],
-        avatar=user_doc.get("avatar"),
-        role=user_doc["role"],
-        subscription=Subscription(**user_doc["subscription"]),
-        preferences=UserPreferences(**user_doc["preferences"]),
-        apiUsage=ApiUsage(**user_doc["apiUsage"]),
-        createdAt=user_doc["createdAt"],
-        updatedAt=user_doc["updatedAt"],
-        lastLogin=user_doc.get("lastLogin"),
-        isVerified=user_doc["isVerified"],
-        isActive=user_doc["isActive"]
-    )
+    user_response = UserResponse.from_document(ctx.user_id, user_doc)
+    
+    # Cache the rendered profile
+    await ctx.cache.set(CacheKeys.user_profile(ctx.user_id), user_response.model_dump_json(), ttl=3600)
+    
+    return user_response
 
 @router.put("/profile", response_model=UserResponse)
 async def update_user_profile(
     user_update: UserUpdate,
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    ctx: Context
 ):
     """
     ✏️ **Update User Profile**
@@ -91,62 +111,48 @@ async def update_user_profile(
         update_data["fullName"] = user_update.fullName
     
     if user_update.username is not None:
-        # Check username availability
-        existing_user = await db.users.find_one({
-            "username": user_update.username,
-            "_id": {"$ne": ObjectId(current_user_id)}
-        })
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
-            )
+        # Availability is enforced by the unique username index on write
         update_data["username"] = user_update.username
     
     if user_update.avatar is not None:
         update_data["avatar"] = user_update.avatar
     
     if user_update.preferences is not None:
-        update_data["preferences"] = user_update.preferences.dict()
+        update_data["preferences"] = user_update.preferences.model_dump()
+    
+    # Update user and get the updated document in the same round trip
+    try:
+        user_doc = await ctx.db.users.find_one_and_update(
+            {"_id": ctx.user_oid},
+            {"$set": update_data},
+            projection=USER_PROFILE_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username already taken"
+        )
     
-    # Update user
-    await db.users.update_one(
-        {"_id": ObjectId(current_user_id)},
-        {"$set": update_data}
-    )
+    if not user_doc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
     
-    # Get updated user
-    user_doc = await db.users.find_one({"_id": ObjectId(current_user_id)})
-    
-    # Update cache
-    user_doc["id"] = current_user_id
-    await cache.set(CacheKeys.user_profile(current_user_id), user_doc, ttl=3600)
-    
-    logger.info(f"User profile updated: {current_user_id}")
-    
-    return UserResponse(
-        id=current_user_id,
-        email=user_doc["email"],
-        username=user_doc["username"],
-        fullName=user_doc["fullName"],
-        avatar=user_doc.get("avatar"),
-        role=user_doc["role"],
-        subscription=Subscription(**user_doc["subscription"]),
-        preferences=UserPreferences(**user_doc["preferences"]),
-        apiUsage=ApiUsage(**user_doc["apiUsage"]),
-        createdAt=user_doc["createdAt"],
-        updatedAt=user_doc["updatedAt"],
-        lastLogin=user_doc.get("lastLogin"),
-        isVerified=user_doc["isVerified"],
-        isActive=user_doc["isActive"]
-    )
+    user_response = UserResponse.from_document(ctx.user_id, user_doc)
+    
+    # Update cache with the rendered profile
+    await ctx.cache.set(CacheKeys.user_profile(ctx.user_id), user_response.model_dump_json(), ttl=3600)
+    
+    logger.info(f"User profile updated: {ctx.user_id}")
+    
+    return user_response
 
 @router.put("/preferences", response_model=dict)
 async def update_user_preferences(
     preferences: UserPreferences,
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    ctx: Context
 ):
     """
     ⚙️ **Update User Preferences**
@@ -160,30 +166,20 @@ async def update_user_preferences(
     - Default currency
     """
     
-    # Update preferences
-    await db.users.update_one(
-        {"_id": ObjectId(current_user_id)},
-        {
-            "$set": {
-                "preferences": preferences.dict(),
-                "updatedAt": datetime.utcnow()
-            }
-        }
-    )
-    
-    # Clear cache to force refresh
-    await cache.delete(CacheKeys.user_profile(current_user_id))
+    # Update preferences and refresh the cached profile in place
+    await _update_cached_profile(ctx, {
+        "preferences": preferences.model_dump(),
+        "updatedAt": datetime.utcnow()
+    })
     
-    logger.info(f"User preferences updated: {current_user_id}")
+    logger.info(f"User preferences updated: {ctx.user_id}")
     
     return {"message": "Preferences updated successfully"}
 
 @router.post("/change-password", response_model=ChangePasswordResponse)
 async def change_password(
     password_data: ChangePasswordRequest,
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    ctx: Context
 ):
     """
     🔐 **Change Password**
@@ -192,7 +188,7 @@ async def change_password(
     """
     
     # Get current user
-    user_doc = await db.users.find_one({"_id": ObjectId(current_user_id)})
+    user_doc = await ctx.db.users.find_one({"_id": ctx.user_oid})
     
     if not user_doc:
         raise HTTPException(
@@ -201,7 +197,7 @@ async def change_password(
         )
     
     # Verify current password
-    if not verify_password(password_data.currentPassword, user_doc["passwordHash"]):
+    if not await averify_password(password_data.currentPassword, user_doc["passwordHash"]):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
@@ -221,9 +217,9 @@ async def change_password(
         )
     
     # Update password
-    new_password_hash = get_password_hash(password_data.newPassword)
-    await db.users.update_one(
-        {"_id": ObjectId(current_user_id)},
+    new_password_hash = await aget_password_hash(password_data.newPassword)
+    await ctx.db.users.update_one(
+        {"_id": ctx.user_oid},
         {
             "$set": {
                 "passwordHash": new_password_hash,
@@ -233,16 +229,19 @@ async def change_password(
     )
     
     # Clear user cache
-    await cache.delete(CacheKeys.user_profile(current_user_id))
+    await ctx.cache.delete_many(
+        CacheKeys.user_profile(ctx.user_id),
+        CacheKeys.user_campaigns(ctx.user_id),
+        CacheKeys.dashboard_metrics(ctx.user_id)
+    )
     
-    logger.info(f"Password changed for user: {current_user_id}")
+    logger.info(f"Password changed for user: {ctx.user_id}")
     
     return ChangePasswordResponse(message="Password changed successfully")
 
 @router.get("/subscription", response_model=Subscription)
 async def get_user_subscription(
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    ctx: Context
 ):
     """
     💳 **Get User Subscription**
@@ -250,8 +249,8 @@ async def get_user_subscription(
     Retrieve current subscription details.
     """
     
-    user_doc = await db.users.find_one(
-        {"_id": ObjectId(current_user_id)},
+    user_doc = await ctx.db.users.find_one(
+        {"_id": ctx.user_oid},
         {"subscription": 1}
     )
     
@@ -265,8 +264,7 @@ async def get_user_subscription(
 
 @router.get("/api-usage", response_model=ApiUsage)
 async def get_api_usage(
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    ctx: Context
 ):
     """
     📊 **Get API Usage**
@@ -274,8 +272,8 @@ async def get_api_usage(
     Retrieve current API usage statistics.
     """
     
-    user_doc = await db.users.find_one(
-        {"_id": ObjectId(current_user_id)},
+    user_doc = await ctx.db.users.find_one(
+        {"_id": ctx.user_oid},
         {"apiUsage": 1}
     )
     
@@ -289,10 +287,8 @@ async def get_api_usage(
 
 @router.post("/upload-avatar")
 async def upload_avatar(
-    file: UploadFile = File(...),
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    ctx: Context,
+    file: UploadFile = File(...)
 ):
     """
     📷 **Upload User Avatar**
@@ -313,34 +309,34 @@ async def upload_avatar(
     
     # Validate file size (5MB max)
     max_size = 5 * 1024 * 1024  # 5MB
-    file_size = len(await file.read())
-    await file.seek(0)  # Reset file pointer
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail="File too large. Maximum size is 5MB."
+    )
     
-    if file_size > max_size:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File too large. Maximum size is 5MB."
-        )
+    # Starlette records the spooled size up front; fall back to counting chunks
+    if file.size is not None:
+        if file.size > max_size:
+            raise too_large
+    else:
+        file_size = 0
+        while chunk := await file.read(64 * 1024):
+            file_size += len(chunk)
+            if file_size > max_size:
+                raise too_large
+        await file.seek(0)  # Reset file pointer
     
     # TODO: Upload to cloud storage (AWS S3, Cloudinary, etc.)
     # For now, we'll store a placeholder URL
-    avatar_url = f"https://avatars.example.com/{current_user_id}/{file.filename}"
-    
-    # Update user avatar
-    await db.users.update_one(
-        {"_id": ObjectId(current_user_id)},
-        {
-            "$set": {
-                "avatar": avatar_url,
-                "updatedAt": datetime.utcnow()
-            }
-        }
-    )
+    avatar_url = f"https://avatars.example.com/{ctx.user_id}/{file.filename}"
     
-    # Clear cache
-    await cache.delete(CacheKeys.user_profile(current_user_id))
+    # Update user avatar and refresh the cached profile in place
+    await _update_cached_profile(ctx, {
+        "avatar": avatar_url,
+        "updatedAt": datetime.utcnow()
+    })
     
-    logger.info(f"Avatar uploaded for user: {current_user_id}")
+    logger.info(f"Avatar uploaded for user: {ctx.user_id}")
     
     return {
         "message": "Avatar uploaded successfully",
@@ -349,9 +345,7 @@ async def upload_avatar(
 
 @router.delete("/deactivate")
 async def deactivate_account(
-    current_user_id: str = Depends(get_current_user_id),
-    db: AsyncIOMotorDatabase = Depends(get_db),
-    cache: CacheManager = Depends()
+    ctx: Context
 ):
     """
     ⚠️ **Deactivate Account**
@@ -359,30 +353,27 @@ async def deactivate_account(
     Deactivate user account (soft delete).
     """
     
-    # Deactivate user
-    await db.users.update_one(
-        {"_id": ObjectId(current_user_id)},
-        {
-            "$set": {
-                "isActive": False,
-                "updatedAt": datetime.utcnow()
-            }
-        }
-    )
+    # Deactivate user and refresh the cached profile in place
+    await _update_cached_profile(ctx, {
+        "isActive": False,
+        "updatedAt": datetime.utcnow()
+    })
     
-    # Clear all user caches
-    await cache.delete(CacheKeys.user_profile(current_user_id))
+    # Derived per-user caches no longer apply
+    await ctx.cache.delete_many(
+        CacheKeys.user_campaigns(ctx.user_id),
+        CacheKeys.dashboard_metrics(ctx.user_id)
+    )
     
-    logger.info(f"Account deactivated: {current_user_id}")
+    logger.info(f"Account deactivated: {ctx.user_id}")
     
     return {"message": "Account deactivated successfully"}
 
 @router.get("/activity", response_model=List[dict])
 async def get_user_activity(
-    current_user_id: str = Depends(get_current_user_id),
-    limit: int = Query(default=50, le=100),
-    offset: int = Query(default=0, ge=0),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    ctx: Context,
+    limit: int = Query(default=50, ge=1, le=100),
+    offset: int = Query(default=0, ge=0)
 ):
     """
     📈 **Get User Activity**
@@ -390,40 +381,15 @@ async def get_user_activity(
     Retrieve user activity logs and history.
     """
     
-    # Get user activities (campaigns, ads, etc.)
-    activities = []
-    
-    # Get recent campaigns
-    campaigns_cursor = db.campaigns.find(
-        {"userId": ObjectId(current_user_id)},
-        {"name": 1, "status": 1, "createdAt": 1, "updatedAt": 1}
-    ).sort("createdAt", -1).limit(limit).skip(offset)
-    
-    async for campaign in campaigns_cursor:
-        activities.append({
-            "type": "campaign",
-            "action": "created" if campaign["createdAt"] == campaign["updatedAt"] else "updated",
-            "title": f"Campaign: {campaign['name']}",
-            "status": campaign["status"],
-            "timestamp": campaign["updatedAt"]
-        })
-    
-    # Get recent ads
-    ads_cursor = db.ads.find(
-        {"userId": ObjectId(current_user_id)},
-        {"title": 1, "status": 1, "createdAt": 1, "updatedAt": 1}
-    ).sort("createdAt", -1).limit(limit).skip(offset)
-    
-    async for ad in ads_cursor:
-        activities.append({
-            "type": "ad",
-            "action": "created" if ad["createdAt"] == ad["updatedAt"] else "updated",
-            "title": f"Ad: {ad['title']}",
-            "status": ad["status"],
-            "timestamp": ad["updatedAt"]
-        })
-    
-    # Sort by timestamp
-    activities.sort(key=lambda x: x["timestamp"], reverse=True)
-    
-    return activities[:limit]
\ No newline at end of file
+    # Merge recent campaigns and ads server-side
+    window = offset + limit
+    
+    activity_pipeline = [
+        *_activity_branch(ctx.user_oid, window, "campaign", "Campaign: ", "name"),
+        {"$unionWith": {"coll": "ads", "pipeline": _activity_branch(ctx.user_oid, window, "ad", "Ad: ", "title")}},
+        {"$sort": {"timestamp": -1}},
+        {"$skip": offset},
+        {"$limit": limit}
+    ]
+    
+    return await (await ctx.db.campaigns.aggregate(activity_pipeline)).to_list(limit)
\ No newline at end of file
@@ -2,10 +2,11 @@
 Redis cache management for Alpha Creator Ads
 """
 
-import aioredis
-from typing import Optional, Any, Union
-import json
+from redis import asyncio as aioredis
+from typing import Optional, Any, Union, Awaitable
+import asyncio
 import logging
+import orjson
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -16,15 +17,24 @@ class Cache:
 # Global cache instance
 cache = Cache()
 
+# Strong references to in-flight background cache writes
+_background_tasks: set = set()
+
+def run_in_background(operation: Awaitable) -> asyncio.Task:
+    """Schedule a cache operation without blocking the response on it"""
+    task = asyncio.ensure_future(operation)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
 async def init_redis():
     """Initialize Redis connection"""
     try:
-        cache.redis = await aioredis.from_url(
+        # from_url only builds the client; connections are opened lazily by the pool
+        cache.redis = aioredis.from_url(
             settings.REDIS_URL,
             db=settings.REDIS_DB,
-            password=settings.REDIS_PASSWORD,
-            encoding="utf-8",
-            decode_responses=True
+            password=settings.REDIS_PASSWORD
         )
         
         # Test connection
@@ -38,13 +48,18 @@ async def init_redis():
 async def close_redis():
     """Close Redis connection"""
     if cache.redis:
-        await cache.redis.close()
+        await cache.redis.aclose()
         logger.info("✅ Redis connection closed")
 
+# Serializes lazy initialization so concurrent first requests share one client
+_redis_init_lock = asyncio.Lock()
+
 async def get_redis() -> aioredis.Redis:
     """Get Redis instance"""
-    if not cache.redis:
-        await init_redis()
+    if cache.redis is None:
+        async with _redis_init_lock:
+            if cache.redis is None:
+                await init_redis()
     return cache.redis
 
 class CacheManager:
@@ -54,16 +69,14 @@ class CacheManager:
     async def set(key: str, value: Any, ttl: int = None) -> bool:
         """Set a value in cache with optional TTL"""
         try:
-            redis = await get_redis()
+            redis = cache.redis or await get_redis()
             
-            # Serialize complex objects to JSON
+            # Serialize complex objects to JSON (ObjectIds and other unknown types as strings)
             if not isinstance(value, (str, int, float, bool)):
-                value = json.dumps(value, default=str)
+                value = orjson.dumps(value, default=str)
             
-            if ttl:
-                return await redis.setex(key, ttl, value)
-            else:
-                return await redis.set(key, value)
+            # SET with EX writes the value and its expiry in one command
+            return await redis.set(key, value, ex=ttl)
                 
         except Exception as e:
             logger.error(f"Cache SET error for key {key}: {e}")
@@ -73,48 +86,120 @@ class CacheManager:
     async def get(key: str) -> Optional[Any]:
         """Get a value from cache"""
         try:
-            redis = await get_redis()
+            redis = cache.redis or await get_redis()
             value = await redis.get(key)
             
             if value is None:
                 return None
             
-            # Try to deserialize JSON
+            # Try to deserialize JSON (orjson parses the raw bytes, no str round trip)
             try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
+                return orjson.loads(value)
+            except orjson.JSONDecodeError:
+                return value.decode()
                 
         except Exception as e:
             logger.error(f"Cache GET error for key {key}: {e}")
             return None
     
+    @staticmethod
+    async def get_many(*keys: str) -> list:
+        """Get several values from cache in a single round trip"""
+        try:
+            redis = cache.redis or await get_redis()
+            values = await redis.mget(keys)
+        except Exception as e:
+            logger.error(f"Cache MGET error for keys {keys}: {e}")
+            return [None] * len(keys)
+        
+        # Deserialize each value the same way get() does
+        result = []
+        for value in values:
+            if value is None:
+                result.append(None)
+                continue
+            try:
+                result.append(orjson.loads(value))
+            except orjson.JSONDecodeError:
+                result.append(value.decode())
+        
+        return result
+    
+    @staticmethod
+    async def get_raw(key: str, ttl: int = None) -> Optional[bytes]:
+        """Get a value from cache as stored, without deserializing or decoding it
+        
+        When a TTL is given the key's expiry is reset in the same command (GETEX),
+        giving frequently read entries a sliding expiration.
+        """
+        try:
+            redis = cache.redis or await get_redis()
+            if ttl:
+                return await redis.execute_command("GETEX", key, "EX", ttl)
+            return await redis.get(key)
+        except Exception as e:
+            logger.error(f"Cache GET error for key {key}: {e}")
+            return None
+    
     @staticmethod
     async def delete(key: str) -> bool:
         """Delete a key from cache"""
         try:
-            redis = await get_redis()
+            redis = cache.redis or await get_redis()
             return bool(await redis.delete(key))
         except Exception as e:
             logger.error(f"Cache DELETE error for key {key}: {e}")
             return False
     
+    @staticmethod
+    async def delete_many(*keys: str) -> int:
+        """Delete several keys from cache in a single round trip"""
+        if not keys:
+            return 0
+        try:
+            redis = cache.redis or await get_redis()
+            # UNLINK reclaims memory in a background thread on the Redis side
+            return await redis.unlink(*keys)
+        except Exception as e:
+            logger.error(f"Cache UNLINK error for keys {keys}: {e}")
+            return 0
+    
+    @staticmethod
+    async def ping() -> bool:
+        """Check that Redis is reachable"""
+        try:
+            redis = cache.redis or await get_redis()
+            return bool(await redis.ping())
+        except Exception as e:
+            logger.error(f"Cache PING error: {e}")
+            return False
+    
     @staticmethod
     async def exists(key: str) -> bool:
         """Check if a key exists in cache"""
         try:
-            redis = await get_redis()
+            redis = cache.redis or await get_redis()
             return bool(await redis.exists(key))
         except Exception as e:
             logger.error(f"Cache EXISTS error for key {key}: {e}")
             return False
     
     @staticmethod
-    async def increment(key: str, amount: int = 1) -> int:
-        """Increment a numeric value in cache"""
+    async def increment(key: str, amount: int = 1, ttl: int = None) -> int:
+        """Increment a numeric value in cache, optionally refreshing its TTL"""
         try:
-            redis = await get_redis()
-            return await redis.incrby(key, amount)
+            redis = cache.redis or await get_redis()
+            
+            if not ttl:
+                return await redis.incrby(key, amount)
+            
+            # Send INCRBY and EXPIRE in a single round trip
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.incrby(key, amount)
+                pipe.expire(key, ttl)
+                result, _ = await pipe.execute()
+            
+            return result
         except Exception as e:
             logger.error(f"Cache INCREMENT error for key {key}: {e}")
             return 0
@@ -123,20 +208,24 @@ class CacheManager:
     async def set_hash(name: str, mapping: dict, ttl: int = None) -> bool:
         """Set a hash in cache"""
         try:
-            redis = await get_redis()
+            redis = cache.redis or await get_redis()
             
             # Serialize complex values in the mapping
             serialized_mapping = {}
             for k, v in mapping.items():
                 if not isinstance(v, (str, int, float, bool)):
-                    serialized_mapping[k] = json.dumps(v, default=str)
+                    serialized_mapping[k] = orjson.dumps(v, default=str)
                 else:
                     serialized_mapping[k] = v
             
-            result = await redis.hset(name, mapping=serialized_mapping)
+            if not ttl:
+                return bool(await redis.hset(name, mapping=serialized_mapping))
             
-            if ttl:
-                await redis.expire(name, ttl)
+            # Send HSET and EXPIRE in a single round trip
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.hset(name, mapping=serialized_mapping)
+                pipe.expire(name, ttl)
+                result, _ = await pipe.execute()
             
             return bool(result)
             
@@ -148,16 +237,16 @@ class CacheManager:
     async def get_hash(name: str) -> dict:
         """Get a hash from cache"""
         try:
-            redis = await get_redis()
+            redis = cache.redis or await get_redis()
             hash_data = await redis.hgetall(name)
             
             # Try to deserialize JSON values
             result = {}
             for k, v in hash_data.items():
                 try:
-                    result[k] = json.loads(v)
-                except (json.JSONDecodeError, TypeError):
-                    result[k] = v
+                    result[k.decode()] = orjson.loads(v)
+                except orjson.JSONDecodeError:
+                    result[k.decode()] = v.decode()
             
             return result
             
@@ -169,7 +258,7 @@ class CacheManager:
     async def add_to_set(key: str, *values: str) -> int:
         """Add values to a set in cache"""
         try:
-            redis = await get_redis()
+            redis = cache.redis or await get_redis()
             return await redis.sadd(key, *values)
         except Exception as e:
             logger.error(f"Cache SADD error for set {key}: {e}")
@@ -179,8 +268,8 @@ class CacheManager:
     async def get_set_members(key: str) -> set:
         """Get all members of a set from cache"""
         try:
-            redis = await get_redis()
-            return await redis.smembers(key)
+            redis = cache.redis or await get_redis()
+            return {member.decode() for member in await redis.smembers(key)}
         except Exception as e:
             logger.error(f"Cache SMEMBERS error for set {key}: {e}")
             return set()
@@ -189,7 +278,7 @@ class CacheManager:
     async def push_to_list(key: str, *values: str) -> int:
         """Push values to a list in cache"""
         try:
-            redis = await get_redis()
+            redis = cache.redis or await get_redis()
             return await redis.lpush(key, *values)
         except Exception as e:
             logger.error(f"Cache LPUSH error for list {key}: {e}")
@@ -199,12 +288,23 @@ class CacheManager:
     async def get_list_range(key: str, start: int = 0, end: int = -1) -> list:
         """Get range of values from a list in cache"""
         try:
-            redis = await get_redis()
-            return await redis.lrange(key, start, end)
+            redis = cache.redis or await get_redis()
+            return [item.decode() for item in await redis.lrange(key, start, end)]
         except Exception as e:
             logger.error(f"Cache LRANGE error for list {key}: {e}")
             return []
 
+    @staticmethod
+    async def add_to_stream(key: str, fields: dict, maxlen: int = None) -> Optional[str]:
+        """Append an entry to a stream in cache (approximately capped at maxlen)"""
+        try:
+            redis = cache.redis or await get_redis()
+            entry_id = await redis.xadd(key, fields, maxlen=maxlen, approximate=True)
+            return entry_id.decode()
+        except Exception as e:
+            logger.error(f"Cache XADD error for stream {key}: {e}")
+            return None
+
 # Cache key generators
 class CacheKeys:
     """Standardized cache key generators"""
@@ -213,10 +313,28 @@ class CacheKeys:
     def user_profile(user_id: str) -> str:
         return f"user:profile:{user_id}"
     
+    @staticmethod
+    def user_exists(email: str) -> str:
+        return f"user:exists:{email}"
+    
     @staticmethod
     def user_campaigns(user_id: str) -> str:
         return f"user:campaigns:{user_id}"
     
+    # Cached for 5 minutes by create_campaign; anything that changes a user's
+    # subscription.plan must delete this key (no route does so today)
+    @staticmethod
+    def user_plan(user_id: str) -> str:
+        return f"user:plan:{user_id}"
+    
+    @staticmethod
+    def user_campaign_count(user_id: str) -> str:
+        return f"user:campaign_count:{user_id}"
+    
+    @staticmethod
+    def campaign(campaign_id: str) -> str:
+        return f"campaign:{campaign_id}"
+    
     @staticmethod
     def campaign_analytics(campaign_id: str) -> str:
         return f"campaign:analytics:{campaign_id}"
@@ -240,8 +358,15 @@ class CacheKeys:
     @staticmethod
     def dashboard_metrics(user_id: str) -> str:
         return f"dashboard:metrics:{user_id}"
+    
+    @staticmethod
+    def email_verification_stream() -> str:
+        return "emails:verify"
+
+# Shared cache manager instance
+cache_manager = CacheManager()
 
 # Dependency for FastAPI
 async def get_cache() -> CacheManager:
     """Dependency to get cache manager in FastAPI endpoints"""
-    return CacheManager()
\ No newline at end of file
+    return cache_manager
@@ -3,8 +3,10 @@ Configuration management for Alpha Creator Ads
 Handles environment variables and application settings
 """
 
-from pydantic import BaseSettings, validator
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List, Optional
+from functools import lru_cache
 import os
 from pathlib import Path
 
@@ -24,12 +26,15 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    BCRYPT_ROUNDS: int = 12
     
     # Database
     MONGODB_URL: str = "mongodb://localhost:27017"
     MONGODB_DB_NAME: str = "alpha_creator_ads"
     MONGODB_MIN_CONNECTIONS: int = 10
     MONGODB_MAX_CONNECTIONS: int = 100
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = 2000  # fail fast when the pool is exhausted
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 3000
     
     # Redis Cache
     REDIS_URL: str = "redis://localhost:6379"
@@ -47,6 +52,11 @@ class Settings(BaseSettings):
     ]
     ALLOWED_HOSTS: List[str] = ["*"]
     
+    # Outbound HTTP (shared client for external APIs)
+    HTTP_CLIENT_TIMEOUT: float = 10.0
+    HTTP_MAX_CONNECTIONS: int = 200
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 50
+    
     # External APIs
     OPENAI_API_KEY: Optional[str] = None
     OPENAI_MODEL: str = "gpt-4"
@@ -91,42 +101,43 @@ class Settings(BaseSettings):
     SENTRY_DSN: Optional[str] = None
     LOG_LEVEL: str = "INFO"
     
-    @validator("CORS_ORIGINS", pre=True)
+    @field_validator("CORS_ORIGINS", mode="before")
+    @classmethod
     def parse_cors_origins(cls, v):
         if isinstance(v, str):
             return [origin.strip() for origin in v.split(",")]
         return v
     
-    @validator("ALLOWED_HOSTS", pre=True) 
+    @field_validator("ALLOWED_HOSTS", mode="before")
+    @classmethod
     def parse_allowed_hosts(cls, v):
         if isinstance(v, str):
             return [host.strip() for host in v.split(",")]
         return v
     
-    @validator("SECRET_KEY")
+    @field_validator("SECRET_KEY")
+    @classmethod
     def validate_secret_key(cls, v):
         if len(v) < 32:
             raise ValueError("SECRET_KEY must be at least 32 characters long")
         return v
     
-    @validator("MONGODB_URL")
+    @field_validator("MONGODB_URL")
+    @classmethod
     def validate_mongodb_url(cls, v):
         if not v.startswith("mongodb://") and not v.startswith("mongodb+srv://"):
             raise ValueError("MONGODB_URL must start with mongodb:// or mongodb+srv://")
         return v
     
-    @validator("REDIS_URL")
+    @field_validator("REDIS_URL")
+    @classmethod
     def validate_redis_url(cls, v):
         if not v.startswith("redis://"):
             raise ValueError("REDIS_URL must start with redis://")
         return v
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
-
-# Create settings instance
-settings = Settings()
+    # .env is shared with the legacy services and carries keys this app doesn't declare
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra="ignore")
 
 # Environment-specific configurations
 class DevelopmentSettings(Settings):
@@ -144,9 +155,10 @@ class TestingSettings(Settings):
     REDIS_DB: int = 1
     ENVIRONMENT: str = "testing"
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """
-    Factory function to get environment-specific settings
+    Factory function to get environment-specific settings (built once per process)
     """
     environment = os.getenv("ENVIRONMENT", "development")
     
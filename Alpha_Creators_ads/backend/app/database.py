@@ -2,29 +2,41 @@
 Database connection management for MongoDB
 """
 
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.database import AsyncDatabase
 from typing import Optional
+import asyncio
 import logging
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 class Database:
-    client: Optional[AsyncIOMotorClient] = None
-    database: Optional[AsyncIOMotorDatabase] = None
+    client: Optional[AsyncMongoClient] = None
+    database: Optional[AsyncDatabase] = None
 
 # Global database instance
 db = Database()
 
+# Makes init_database() idempotent so one client (and pool) is ever created
+_init_lock = asyncio.Lock()
+
 async def init_database():
     """Initialize database connection"""
+    async with _init_lock:
+        if db.database is None:
+            await _connect()
+
+async def _connect():
+    """Create the client, verify connectivity and set up collections"""
     try:
-        # Create MongoDB client
-        db.client = AsyncIOMotorClient(
+        # Create MongoDB client (native asyncio driver, no executor hop per operation)
+        db.client = AsyncMongoClient(
             settings.MONGODB_URL,
             minPoolSize=settings.MONGODB_MIN_CONNECTIONS,
             maxPoolSize=settings.MONGODB_MAX_CONNECTIONS,
-            serverSelectionTimeoutMS=5000
+            waitQueueTimeoutMS=settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+            serverSelectionTimeoutMS=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS
         )
         
         # Get database
@@ -43,14 +55,15 @@ async def init_database():
 
 async def close_database():
     """Close database connection"""
-    if db.client:
-        db.client.close()
+    if db.client is not None:
+        await db.client.close()
+        db.client = None
+        db.database = None
         logger.info("✅ MongoDB connection closed")
 
-async def get_database() -> AsyncIOMotorDatabase:
-    """Get database instance"""
-    if not db.database:
-        await init_database()
+async def get_database() -> AsyncDatabase:
+    """Get database instance (connected once at application startup)"""
+    assert db.database is not None, "init_database() must run before the database is used"
     return db.database
 
 async def init_collections():
@@ -61,6 +74,7 @@ async def init_collections():
         'campaigns', 
         'ads',
         'analytics',
+        'analytics_daily',
         'audience_segments',
         'ai_generations'
     ]
@@ -81,19 +95,33 @@ async def create_indexes():
     # Users collection indexes
     await db.database.users.create_index("email", unique=True)
     await db.database.users.create_index("username", unique=True) 
+    # Covers the login lookup (email -> _id, passwordHash, isActive) without a document fetch
+    await db.database.users.create_index(
+        [("email", 1), ("passwordHash", 1), ("isActive", 1), ("_id", 1)],
+        name="login_credentials"
+    )
     await db.database.users.create_index("createdAt")
     await db.database.users.create_index("subscription.plan")
     
-    # Campaigns collection indexes
-    await db.database.campaigns.create_index([("userId", 1), ("status", 1)])
+    # Campaigns collection indexes (equality fields first, then the list sort field)
+    await db.database.campaigns.create_index([("userId", 1), ("status", 1), ("createdAt", -1)])
+    await db.database.campaigns.create_index([("userId", 1), ("createdAt", -1)])
+    await db.database.campaigns.create_index([("userId", 1), ("updatedAt", -1)])
+    await db.database.campaigns.create_index([("userId", 1), ("analytics.spent", -1)])
+    await db.database.campaigns.create_index([("userId", 1), ("platforms", 1)])
     await db.database.campaigns.create_index([("createdAt", -1)])
     await db.database.campaigns.create_index("status")
     await db.database.campaigns.create_index("platforms")
+    await db.database.campaigns.create_index(
+        [("name", "text"), ("description", "text")],
+        name="campaign_search"
+    )
     
     # Ads collection indexes
     await db.database.ads.create_index([("campaignId", 1), ("status", 1)])
     await db.database.ads.create_index([("userId", 1), ("aiGenerated", 1)])
     await db.database.ads.create_index([("createdAt", -1)])
+    await db.database.ads.create_index([("userId", 1), ("updatedAt", -1)])
     await db.database.ads.create_index("platform")
     await db.database.ads.create_index("type")
     
@@ -103,6 +131,9 @@ async def create_indexes():
     await db.database.analytics.create_index([("userId", 1), ("timestamp", -1)])
     await db.database.analytics.create_index([("adId", 1), ("timestamp", -1)])
     
+    # Per-campaign daily analytics rollups ($merge target, so the key must be unique)
+    await db.database.analytics_daily.create_index([("campaignId", 1), ("day", 1)], unique=True)
+    
     # Audience segments indexes
     await db.database.audience_segments.create_index([("userId", 1), ("createdAt", -1)])
     await db.database.audience_segments.create_index("name")
@@ -115,6 +146,6 @@ async def create_indexes():
     logger.info("✅ Database indexes created successfully")
 
 # Dependency for FastAPI
-async def get_db() -> AsyncIOMotorDatabase:
+async def get_db() -> AsyncDatabase:
     """Dependency to get database in FastAPI endpoints"""
-    return await get_database()
\ No newline at end of file
+    return db.database
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""
+Shared outbound HTTP client for external API calls
+"""
+
+import httpx
+from typing import Optional
+import logging
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class HttpClient:
+    client: Optional[httpx.AsyncClient] = None
+
+# Global HTTP client instance; one connection pool (and TLS session reuse) per process
+http = HttpClient()
+
+async def init_http_client():
+    """Create the shared HTTP client"""
+    if http.client is None:
+        http.client = httpx.AsyncClient(
+            timeout=settings.HTTP_CLIENT_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS
+            )
+        )
+        logger.info("✅ HTTP client ready")
+
+async def close_http_client():
+    """Close the shared HTTP client and its pooled connections"""
+    if http.client is not None:
+        await http.client.aclose()
+        http.client = None
+        logger.info("✅ HTTP client closed")
+
+# Dependency for FastAPI
+def get_http_client() -> httpx.AsyncClient:
+    """Dependency to get the shared HTTP client in FastAPI endpoints"""
+    assert http.client is not None, "init_http_client() must run before outbound HTTP calls"
+    return http.client
@@ -3,22 +3,31 @@ Alpha Creator Ads - Main FastAPI Application
 Production-ready advertising platform backend
 """
 
-from fastapi import FastAPI, HTTPException, Depends, Request, status
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import logging
+import orjson
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
 import uvicorn
 from typing import Dict, Any
 import os
-from datetime import datetime
+import re
+import tempfile
 import time
 
 # Import custom modules
 # Simplified imports for development
 from app.api.v1 import api_router
+from app.database import init_database, close_database
+from app.http_client import init_http_client, close_http_client
+from app.cache import CacheManager, get_cache
+from app.config import settings
+from app.middleware.metrics import MetricsMiddleware
 
 # Setup logging
 logging.basicConfig(
@@ -27,8 +36,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Security
-security = HTTPBearer()
+# Coarse wall-clock timestamp for the informational endpoints, re-rendered at most once a second
+_timestamp_cache: Dict[str, Any] = {"second": None, "iso": ""}
+
+def utc_timestamp() -> str:
+    """Current UTC time as ISO 8601, at one-second resolution"""
+    second = time.time_ns() // 1_000_000_000
+    if second != _timestamp_cache["second"]:
+        _timestamp_cache["second"] = second
+        _timestamp_cache["iso"] = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+    return _timestamp_cache["iso"]
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -37,9 +54,12 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting Alpha Creator Ads Backend...")
     
     # Initialize database connection
-    await connect_to_mongo()
+    await init_database()
     logger.info("✅ Database connection established")
     
+    # Shared outbound HTTP client (keeps connections to external APIs warm)
+    await init_http_client()
+    
     # Redis and other services will be initialized as needed
     logger.info("✅ Core services ready")
     
@@ -51,11 +71,19 @@ async def lifespan(app: FastAPI):
     logger.info("🛑 Shutting down Alpha Creator Ads Backend...")
     
     # Close database connections
-    await close_mongo_connection()
+    await close_database()
     logger.info("✅ Database connections closed")
     
+    # Close outbound HTTP connections
+    await close_http_client()
+    
     logger.info("👋 Backend shutdown complete")
 
+# Interactive docs and the OpenAPI schema are only served in development; elsewhere
+# FastAPI never builds the schema for the ad/campaign/user models
+DOCS_ENABLED = settings.ENVIRONMENT == "development"
+DOCS_URL = "/api/docs" if DOCS_ENABLED else None
+
 # Create FastAPI application
 app = FastAPI(
     title="Alpha Creator Ads API",
@@ -92,9 +120,11 @@ app = FastAPI(
     - 🐛 Issues: https://github.com/alphaads/platform/issues
     """,
     version="1.0.0",
-    docs_url="/api/docs",
-    redoc_url="/api/redoc",
+    docs_url=DOCS_URL,
+    redoc_url="/api/redoc" if DOCS_ENABLED else None,
+    openapi_url="/openapi.json" if DOCS_ENABLED else None,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     contact={
         "name": "Alpha Creator Ads Support",
         "email": "support@alphaads.com",
@@ -109,27 +139,82 @@ app = FastAPI(
 # Security middleware (simplified for development)
 # app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])
 
-# CORS middleware
+# Request counters/latency for /metrics; added first so it is the innermost layer
+# and times the app itself rather than compression or CORS
+app.add_middleware(MetricsMiddleware)
+
+# Response compression - JSON shrinks several-fold; small bodies aren't worth the CPU.
+# Registered before CORS so CORS stays the outer layer and still decorates gzipped responses
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# CORS middleware - explicit lists let Starlette answer preflights with set lookups;
+# exact origins are matched directly and "*.domain" entries via a single regex
+CORS_ALLOWED_ORIGINS = [origin for origin in settings.CORS_ORIGINS if "*" not in origin]
+CORS_ORIGIN_REGEX = "|".join(
+    re.escape(origin).replace(r"\*", r"[^./]+") for origin in settings.CORS_ORIGINS if "*" in origin
+) or None
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins in development
+    allow_origins=CORS_ALLOWED_ORIGINS,
+    allow_origin_regex=CORS_ORIGIN_REGEX,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-    allow_headers=["*"],
-    expose_headers=["X-Total-Count", "X-Page-Count"]
+    allow_headers=["Authorization", "Content-Type", "X-Requested-With"],
+    expose_headers=["X-Total-Count", "X-Page-Count"],
+    max_age=86400
 )
 
-# Custom middleware will be added in production
+# Custom middleware will be added in production. Subclass
+# app.middleware.asgi_base.PureASGIMiddleware and register it with
+# app.add_middleware(); don't use BaseHTTPMiddleware / @app.middleware("http").
 
 # Static files
+STATIC_CACHE_CONTROL = "public, max-age=86400"
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers and proxies keep assets instead of revalidating each load"""
+    
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault("Cache-Control", STATIC_CACHE_CONTROL)
+        return response
+
+# Directory existence is checked once here, so StaticFiles skips its own check
 if os.path.exists("static"):
-    app.mount("/static", StaticFiles(directory="static"), name="static")
+    app.mount("/static", CachedStaticFiles(directory="static", check_dir=False), name="static")
 
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
+# Static part of the root payload; only the timestamp varies per request
+ROOT_INFO = {
+    "message": "🚀 Alpha Creator Ads API",
+    "version": "1.0.0",
+    "status": "active",
+    "docs_url": DOCS_URL,
+    "endpoints": {
+        "authentication": "/api/v1/auth/",
+        "campaigns": "/api/v1/campaigns/",
+        "ads": "/api/v1/ads/", 
+        "analytics": "/api/v1/analytics/",
+        "ai_generation": "/api/v1/ai/",
+        "users": "/api/v1/users/"
+    },
+    "features": [
+        "AI-Powered Ad Generation",
+        "Multi-Platform Campaign Management", 
+        "Real-time Analytics",
+        "Advanced Targeting",
+        "Budget Optimization"
+    ]
+}
+
+# Rendered root body, rebuilt only when the (per-second) timestamp changes
+_root_body: Dict[str, Any] = {"timestamp": None, "body": b""}
+
 # Root endpoint
-@app.get("/", tags=["Root"])
+@app.get("/", tags=["Root"], response_class=ORJSONResponse)
 async def root():
     """
     🏠 **API Root Endpoint**
@@ -140,32 +225,23 @@ async def root():
     Returns:
         dict: API information and status
     """
-    return {
-        "message": "🚀 Alpha Creator Ads API",
-        "version": "1.0.0",
-        "status": "active",
-        "timestamp": datetime.utcnow().isoformat(),
-        "docs_url": "/api/docs",
-        "endpoints": {
-            "authentication": "/api/v1/auth/",
-            "campaigns": "/api/v1/campaigns/",
-            "ads": "/api/v1/ads/", 
-            "analytics": "/api/v1/analytics/",
-            "ai_generation": "/api/v1/ai/",
-            "users": "/api/v1/users/"
-        },
-        "features": [
-            "AI-Powered Ad Generation",
-            "Multi-Platform Campaign Management", 
-            "Real-time Analytics",
-            "Advanced Targeting",
-            "Budget Optimization"
-        ]
-    }
+    timestamp = utc_timestamp()
+    if timestamp != _root_body["timestamp"]:
+        _root_body["timestamp"] = timestamp
+        _root_body["body"] = orjson.dumps({**ROOT_INFO, "timestamp": timestamp})
+    return Response(content=_root_body["body"], media_type="application/json")
+
+# Last /health result, reused briefly so load balancer / k8s probes stay cheap.
+# Real Redis/Mongo pings added here should use small dedicated clients, not the app pools.
+HEALTH_CACHE_TTL = 2.0
+
+# Environment is fixed for the life of the process, so read the key once
+AI_SERVICE_CONFIGURED = bool(os.getenv("OPENAI_API_KEY"))
+_health_cache: Dict[str, Any] = {"ts": 0.0, "payload": None}
 
 # Health check endpoint
-@app.get("/health", tags=["Health"])
-async def health_check():
+@app.get("/health", tags=["Health"], response_class=ORJSONResponse)
+async def health_check(cache: CacheManager = Depends(get_cache)):
     """
     ❤️ **System Health Check**
     
@@ -175,9 +251,13 @@ async def health_check():
     Returns:
         dict: Detailed health status of all components
     """
+    now = time.monotonic()
+    if _health_cache["payload"] is not None and now - _health_cache["ts"] < HEALTH_CACHE_TTL:
+        return _health_cache["payload"]
+    
     health_status = {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": utc_timestamp(),
         "version": "1.0.0",
         "uptime": time.time(),
         "services": {}
@@ -191,97 +271,104 @@ async def health_check():
     }
     
     # Check Redis connection
-    try:
-        from app.cache import CacheManager
-        cache = CacheManager()
-        # Redis check would go here
-        pass
+    if await cache.ping():
         health_status["services"]["cache"] = {
             "status": "healthy",
             "type": "Redis"
         }
-    except Exception as e:
+    else:
+        health_status["status"] = "degraded"
         health_status["services"]["cache"] = {
             "status": "unhealthy",
-            "error": str(e)
+            "type": "Redis"
         }
     
     # Check external services
     health_status["services"]["ai_service"] = {
-        "status": "healthy" if os.getenv("OPENAI_API_KEY") else "not_configured",
+        "status": "healthy" if AI_SERVICE_CONFIGURED else "not_configured",
         "type": "OpenAI GPT-4"
     }
     
+    _health_cache["ts"] = now
+    _health_cache["payload"] = health_status
+    
     return health_status
 
+# Each worker process keeps its own samples. With PROMETHEUS_MULTIPROC_DIR set (before prometheus_client
+# is imported) the workers write them to that directory and /metrics aggregates across all of them;
+# without it the numbers only cover whichever worker answered the scrape
+if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+    METRICS_REGISTRY = CollectorRegistry()
+    multiprocess.MultiProcessCollector(METRICS_REGISTRY)
+else:
+    METRICS_REGISTRY = REGISTRY
+
 # Metrics endpoint for monitoring
-@app.get("/metrics", tags=["Monitoring"])
+@app.get("/metrics", tags=["Monitoring"], response_class=Response)
 async def metrics():
     """
     📊 **System Metrics**
     
-    Provides system metrics for monitoring and alerting.
+    Provides system metrics for monitoring and alerting, in the Prometheus text format.
     """
-    return {
-        "timestamp": datetime.utcnow().isoformat(),
-        "requests": {
-            "total": 0,  # Would be tracked in middleware
-            "rate": "0/sec"
+    # Passed as a header: CONTENT_TYPE_LATEST already carries the charset Starlette would append
+    return Response(generate_latest(METRICS_REGISTRY), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+# API info never changes at runtime, so its JSON body is rendered once at import
+API_INFO_BODY = orjson.dumps({
+    "api_version": "1.0.0",
+    "supported_formats": ["JSON"],
+    "authentication": "JWT Bearer Token",
+    "rate_limits": {
+        "free": "100 requests/hour",
+        "pro": "1000 requests/hour", 
+        "enterprise": "unlimited"
+    },
+    "features": {
+        "ai_generation": {
+            "models": ["GPT-4", "GPT-3.5-turbo"],
+            "formats": ["text", "image_prompts"],
+            "languages": ["en", "es", "fr", "de"]
         },
-        "database": {
-            "connections": 10,
-            "queries_per_second": 0
+        "analytics": {
+            "real_time": True,
+            "historical_data": "90 days",
+            "export_formats": ["CSV", "PDF", "JSON"]
         },
-        "memory": {
-            "usage": "256MB",
-            "available": "2GB"
-        }
+        "platforms": [
+            "Google Ads",
+            "Facebook Ads", 
+            "Instagram Ads",
+            "LinkedIn Ads"
+        ]
     }
+})
 
 # API Info endpoint
-@app.get("/api/info", tags=["API Info"])
+@app.get("/api/info", tags=["API Info"], response_class=ORJSONResponse)
 async def api_info():
     """
     ℹ️ **API Information**
     
     Detailed information about API capabilities, rate limits, and usage.
     """
-    return {
-        "api_version": "1.0.0",
-        "supported_formats": ["JSON"],
-        "authentication": "JWT Bearer Token",
-        "rate_limits": {
-            "free": "100 requests/hour",
-            "pro": "1000 requests/hour", 
-            "enterprise": "unlimited"
-        },
-        "features": {
-            "ai_generation": {
-                "models": ["GPT-4", "GPT-3.5-turbo"],
-                "formats": ["text", "image_prompts"],
-                "languages": ["en", "es", "fr", "de"]
-            },
-            "analytics": {
-                "real_time": True,
-                "historical_data": "90 days",
-                "export_formats": ["CSV", "PDF", "JSON"]
-            },
-            "platforms": [
-                "Google Ads",
-                "Facebook Ads", 
-                "Instagram Ads",
-                "LinkedIn Ads"
-            ]
-        }
-    }
+    return Response(content=API_INFO_BODY, media_type="application/json")
 
 if __name__ == "__main__":
+    # Production runs multiple workers without the reloader or per-request access logging
+    production = settings.ENVIRONMENT == "production"
+    if production:
+        # Workers inherit this and share a fresh directory for their metric samples
+        os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="prometheus-"))
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        reload_dirs=["app"],
+        reload=not production,
+        reload_dirs=None if production else ["app"],
+        workers=(os.cpu_count() or 1) * 2 + 1 if production else None,
+        loop="uvloop",
+        http="httptools",
         log_level="info",
-        access_log=True
-    )
\ No newline at end of file
+        access_log=not production
+    )
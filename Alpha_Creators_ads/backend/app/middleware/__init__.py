@@ -0,0 +1 @@
+# Middleware package
\ No newline at end of file
@@ -0,0 +1,31 @@
+"""
+Base class for pure ASGI middleware
+
+Starlette's BaseHTTPMiddleware (and @app.middleware("http")) wraps every
+request in a task group, memory streams and a streaming response, even when
+the middleware only passes the request through. Middleware for this app is
+written against the raw ASGI interface instead and registered with
+app.add_middleware().
+"""
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+class PureASGIMiddleware:
+    """
+    Pass-through ASGI middleware; subclasses override `handle` for HTTP requests.
+    
+    Non-HTTP scopes (lifespan, websocket) are forwarded untouched. To alter the
+    response, wrap `send` inside `handle` rather than buffering the body.
+    """
+    
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        await self.handle(scope, receive, send)
+    
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.app(scope, receive, send)
@@ -0,0 +1,47 @@
+"""
+Prometheus request metrics
+
+Counters and histograms live at module scope and are rendered in the
+Prometheus text exposition format by the /metrics endpoint. Under several
+uvicorn workers PROMETHEUS_MULTIPROC_DIR must be set so that endpoint can
+aggregate every worker's samples instead of reporting one process.
+"""
+
+import time
+from prometheus_client import Counter, Histogram
+from starlette.types import Message, Receive, Scope, Send
+
+from app.middleware.asgi_base import PureASGIMiddleware
+
+REQUEST_COUNT = Counter(
+    "http_requests_total",
+    "HTTP requests handled",
+    ["method", "route", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route"]
+)
+
+class MetricsMiddleware(PureASGIMiddleware):
+    """Count requests and time them, labelled by route template rather than raw path"""
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope; templates keep label cardinality bounded
+            route = scope.get("route")
+            route_label = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.labels(scope["method"], route_label).observe(time.perf_counter() - start)
+            REQUEST_COUNT.labels(scope["method"], route_label, str(status_code)).inc()
@@ -2,7 +2,7 @@
 Ad-related Pydantic models
 """
 
-from pydantic import BaseModel, validator, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, field_validator, HttpUrl
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -35,10 +35,11 @@ class AdContent(BaseModel):
     description: str
     cta: str
     body: Optional[str] = None
-    images: List[str] = []  # URLs
-    videos: List[str] = []  # URLs
+    images: List[str] = Field(default_factory=list)  # URLs
+    videos: List[str] = Field(default_factory=list)  # URLs
     
-    @validator('headline')
+    @field_validator('headline')
+    @classmethod
     def validate_headline(cls, v):
         if len(v.strip()) < 5:
             raise ValueError('Headline must be at least 5 characters long')
@@ -46,7 +47,8 @@ class AdContent(BaseModel):
             raise ValueError('Headline cannot exceed 100 characters')
         return v.strip()
     
-    @validator('description')
+    @field_validator('description')
+    @classmethod
     def validate_description(cls, v):
         if len(v.strip()) < 10:
             raise ValueError('Description must be at least 10 characters long')
@@ -54,7 +56,8 @@ class AdContent(BaseModel):
             raise ValueError('Description cannot exceed 500 characters')
         return v.strip()
     
-    @validator('cta')
+    @field_validator('cta')
+    @classmethod
     def validate_cta(cls, v):
         if len(v.strip()) < 2:
             raise ValueError('CTA must be at least 2 characters long')
@@ -68,8 +71,11 @@ class GenerationParams(BaseModel):
     emotionalTone: EmotionalTone = EmotionalTone.PROFESSIONAL
     targetAudience: str
     productCategory: str
-    keywords: List[str] = []
+    keywords: List[str] = Field(default_factory=list)
     brandVoice: Optional[str] = None
+    
+    # Keep validated enum fields as plain strings (what MongoDB stores and responses emit)
+    model_config = ConfigDict(use_enum_values=True)
 
 class AdPerformance(BaseModel):
     impressions: int = 0
@@ -93,11 +99,14 @@ class AdBase(BaseModel):
     content: AdContent
     platform: str
     
-    @validator('campaignId')
+    @field_validator('campaignId')
+    @classmethod
     def validate_campaign_id(cls, v):
         if not v.strip():
             raise ValueError('Campaign ID is required')
         return v
+    
+    model_config = ConfigDict(use_enum_values=True)
 
 class AdCreate(AdBase):
     aiGenerated: bool = False
@@ -107,6 +116,8 @@ class AdUpdate(BaseModel):
     content: Optional[AdContent] = None
     status: Optional[AdStatus] = None
     platform: Optional[str] = None
+    
+    model_config = ConfigDict(use_enum_values=True)
 
 class AdInDB(AdBase):
     id: str
@@ -114,29 +125,17 @@ class AdInDB(AdBase):
     aiGenerated: bool = False
     generationParams: Optional[GenerationParams] = None
     status: AdStatus = AdStatus.DRAFT
-    performance: AdPerformance = AdPerformance()
-    abTesting: ABTesting = ABTesting()
+    performance: AdPerformance = Field(default_factory=AdPerformance)
+    abTesting: ABTesting = Field(default_factory=ABTesting)
     createdAt: datetime
     updatedAt: datetime
     publishedAt: Optional[datetime] = None
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
-class AdResponse(AdBase):
-    id: str
-    userId: str
-    aiGenerated: bool
-    generationParams: Optional[GenerationParams]
-    status: AdStatus
-    performance: AdPerformance
-    abTesting: ABTesting
-    createdAt: datetime
-    updatedAt: datetime
-    publishedAt: Optional[datetime]
-    
-    class Config:
-        populate_by_name = True
+# Responses expose the stored shape unchanged, so they share the InDB model
+# (and its compiled validator/serializer) instead of redeclaring every field
+AdResponse = AdInDB
 
 class AdSummary(BaseModel):
     id: str
@@ -147,6 +146,8 @@ class AdSummary(BaseModel):
     platform: str
     performance: AdPerformance
     createdAt: datetime
+    
+    model_config = ConfigDict(use_enum_values=True)
 
 class AdGenerationRequest(BaseModel):
     campaignId: str
@@ -156,11 +157,14 @@ class AdGenerationRequest(BaseModel):
     generateVariants: bool = False
     variantCount: int = 1
     
-    @validator('variantCount')
+    @field_validator('variantCount')
+    @classmethod
     def validate_variant_count(cls, v):
         if v < 1 or v > 5:
             raise ValueError('Variant count must be between 1 and 5')
         return v
+    
+    model_config = ConfigDict(use_enum_values=True)
 
 class AdGenerationResponse(BaseModel):
     ads: List[AdContent]
@@ -2,7 +2,7 @@
 Campaign-related Pydantic models
 """
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -31,29 +31,31 @@ class AgeRange(BaseModel):
     min: int = 18
     max: int = 65
     
-    @validator('min')
+    @field_validator('min')
+    @classmethod
     def validate_min_age(cls, v):
         if v < 13:
             raise ValueError('Minimum age must be at least 13')
         return v
     
-    @validator('max')
+    @field_validator('max')
+    @classmethod
     def validate_max_age(cls, v):
         if v > 100:
             raise ValueError('Maximum age cannot exceed 100')
         return v
 
 class Demographics(BaseModel):
-    ageRange: AgeRange = AgeRange()
-    gender: List[str] = ["all"]
-    locations: List[str] = []
-    languages: List[str] = ["en"]
+    ageRange: AgeRange = Field(default_factory=AgeRange)
+    gender: List[str] = Field(default_factory=lambda: ["all"])
+    locations: List[str] = Field(default_factory=list)
+    languages: List[str] = Field(default_factory=lambda: ["en"])
 
 class Targeting(BaseModel):
-    demographics: Demographics = Demographics()
-    interests: List[str] = []
-    behaviors: List[str] = []
-    customAudiences: List[str] = []
+    demographics: Demographics = Field(default_factory=Demographics)
+    interests: List[str] = Field(default_factory=list)
+    behaviors: List[str] = Field(default_factory=list)
+    customAudiences: List[str] = Field(default_factory=list)
 
 class Budget(BaseModel):
     total: float
@@ -61,19 +63,20 @@ class Budget(BaseModel):
     currency: str = "USD"
     dailyLimit: Optional[float] = None
     
-    @validator('total')
+    @field_validator('total')
+    @classmethod
     def validate_total_budget(cls, v):
         if v <= 0:
             raise ValueError('Total budget must be greater than 0')
         return v
     
-    @validator('dailyLimit')
-    def validate_daily_limit(cls, v, values):
-        if v is not None and v <= 0:
+    @model_validator(mode="after")
+    def validate_daily_limit(self):
+        if self.dailyLimit is not None and self.dailyLimit <= 0:
             raise ValueError('Daily limit must be greater than 0')
-        if v is not None and 'total' in values and v > values['total']:
+        if self.dailyLimit is not None and self.dailyLimit > self.total:
             raise ValueError('Daily limit cannot exceed total budget')
-        return v
+        return self
 
 class Schedule(BaseModel):
     startDate: datetime
@@ -81,11 +84,11 @@ class Schedule(BaseModel):
     timezone: str = "UTC"
     dayParting: Optional[Dict[str, List[str]]] = None
     
-    @validator('endDate')
-    def validate_end_date(cls, v, values):
-        if v and 'startDate' in values and v <= values['startDate']:
+    @model_validator(mode="after")
+    def validate_end_date(self):
+        if self.endDate and self.endDate <= self.startDate:
             raise ValueError('End date must be after start date')
-        return v
+        return self
 
 class Performance(BaseModel):
     impressions: int = 0
@@ -101,15 +104,19 @@ class CampaignBase(BaseModel):
     description: Optional[str] = None
     objective: CampaignObjective
     budget: Budget
-    targeting: Targeting = Targeting()
+    targeting: Targeting = Field(default_factory=Targeting)
     schedule: Schedule
-    platforms: List[Platform] = []
+    platforms: List[Platform] = Field(default_factory=list)
     
-    @validator('name')
+    @field_validator('name')
+    @classmethod
     def validate_name(cls, v):
         if len(v.strip()) < 3:
             raise ValueError('Campaign name must be at least 3 characters long')
         return v.strip()
+    
+    # Keep validated enum fields as plain strings (what MongoDB stores and responses emit)
+    model_config = ConfigDict(use_enum_values=True)
 
 class CampaignCreate(CampaignBase):
     pass
@@ -122,30 +129,43 @@ class CampaignUpdate(BaseModel):
     targeting: Optional[Targeting] = None
     schedule: Optional[Schedule] = None
     platforms: Optional[List[Platform]] = None
+    
+    model_config = ConfigDict(use_enum_values=True)
 
 class CampaignInDB(CampaignBase):
     id: str
     userId: str
     status: CampaignStatus = CampaignStatus.DRAFT
-    ads: List[str] = []  # List of ad IDs
-    performance: Performance = Performance()
-    createdAt: datetime
-    updatedAt: datetime
-    
-    class Config:
-        populate_by_name = True
-
-class CampaignResponse(CampaignBase):
-    id: str
-    userId: str
-    status: CampaignStatus
-    ads: List[str]
-    performance: Performance
+    ads: List[str] = Field(default_factory=list)  # List of ad IDs
+    performance: Performance = Field(default_factory=Performance)
     createdAt: datetime
     updatedAt: datetime
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
+
+# Responses expose the stored shape unchanged, so they share the InDB model
+# (and its compiled validator/serializer) instead of redeclaring every field
+CampaignResponse = CampaignInDB
+
+# MongoDB projection - only fetch the fields rendered into campaign responses
+CAMPAIGN_RESPONSE_PROJECTION = {
+    "userId": 1,
+    "name": 1,
+    "description": 1,
+    "objective": 1,
+    "status": 1,
+    "budget": 1,
+    "schedule": 1,
+    "targeting": 1,
+    "creativeRequirements": 1,
+    "platforms": 1,
+    "tags": 1,
+    "analytics": 1,
+    "optimization": 1,
+    "createdAt": 1,
+    "updatedAt": 1,
+    "lastOptimized": 1
+}
 
 class CampaignSummary(BaseModel):
     id: str
@@ -2,10 +2,17 @@
 User-related Pydantic models
 """
 
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, field_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
+import re
+
+# Precompiled credential checks (each scan runs in the regex engine, not per-char bytecode)
+USERNAME_RE = re.compile(r"[\w-]+")
+PASSWORD_UPPER_RE = re.compile(r"[A-Z]")
+PASSWORD_LOWER_RE = re.compile(r"[a-z]")
+PASSWORD_DIGIT_RE = re.compile(r"\d")
 
 class UserRole(str, Enum):
     ADMIN = "admin"
@@ -37,12 +44,12 @@ class Subscription(BaseModel):
     status: SubscriptionStatus = SubscriptionStatus.ACTIVE
     startDate: datetime
     endDate: Optional[datetime] = None
-    features: List[str] = []
+    features: List[str] = Field(default_factory=list)
 
 class UserPreferences(BaseModel):
     theme: Theme = Theme.LIGHT
     language: str = "en"
-    notifications: NotificationSettings = NotificationSettings()
+    notifications: NotificationSettings = Field(default_factory=NotificationSettings)
     defaultCurrency: str = "USD"
 
 class ApiUsage(BaseModel):
@@ -57,26 +64,28 @@ class UserBase(BaseModel):
     avatar: Optional[str] = None
     role: UserRole = UserRole.USER
     
-    @validator('username')
+    @field_validator('username')
+    @classmethod
     def validate_username(cls, v):
         if len(v) < 3:
             raise ValueError('Username must be at least 3 characters long')
-        if not v.replace('_', '').replace('-', '').isalnum():
+        if not USERNAME_RE.fullmatch(v):
             raise ValueError('Username can only contain letters, numbers, hyphens, and underscores')
         return v.lower()
 
 class UserCreate(UserBase):
     password: str
     
-    @validator('password')
+    @field_validator('password')
+    @classmethod
     def validate_password(cls, v):
         if len(v) < 8:
             raise ValueError('Password must be at least 8 characters long')
-        if not any(c.isupper() for c in v):
+        if not PASSWORD_UPPER_RE.search(v):
             raise ValueError('Password must contain at least one uppercase letter')
-        if not any(c.islower() for c in v):
+        if not PASSWORD_LOWER_RE.search(v):
             raise ValueError('Password must contain at least one lowercase letter')  
-        if not any(c.isdigit() for c in v):
+        if not PASSWORD_DIGIT_RE.search(v):
             raise ValueError('Password must contain at least one digit')
         return v
 
@@ -89,16 +98,15 @@ class UserInDB(UserBase):
     id: str
     passwordHash: str
     subscription: Subscription
-    preferences: UserPreferences = UserPreferences()
-    apiUsage: ApiUsage = ApiUsage()
+    preferences: UserPreferences = Field(default_factory=UserPreferences)
+    apiUsage: ApiUsage = Field(default_factory=ApiUsage)
     createdAt: datetime
     updatedAt: datetime
     lastLogin: Optional[datetime] = None
     isVerified: bool = False
     isActive: bool = True
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 class UserResponse(BaseModel):
     id: str
@@ -116,8 +124,50 @@ class UserResponse(BaseModel):
     isVerified: bool
     isActive: bool
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
+    
+    @classmethod
+    def from_document(cls, user_id: str, user_doc: Dict[str, Any]) -> "UserResponse":
+        """Build a response from a trusted MongoDB user document, skipping validation"""
+        preferences = user_doc["preferences"]
+        return cls.model_construct(
+            id=user_id,
+            email=user_doc["email"],
+            username=user_doc["username"],
+            fullName=user_doc["fullName"],
+            avatar=user_doc.get("avatar"),
+            role=user_doc["role"],
+            subscription=Subscription.model_construct(**user_doc["subscription"]),
+            preferences=UserPreferences.model_construct(**{
+                **preferences,
+                "notifications": NotificationSettings.model_construct(**preferences.get("notifications", {}))
+            }),
+            apiUsage=ApiUsage.model_construct(**user_doc["apiUsage"]),
+            createdAt=user_doc["createdAt"],
+            updatedAt=user_doc["updatedAt"],
+            lastLogin=user_doc.get("lastLogin"),
+            isVerified=user_doc["isVerified"],
+            isActive=user_doc["isActive"]
+        )
+
+# MongoDB projections - only fetch the fields rendered into UserResponse
+USER_PROFILE_PROJECTION = {
+    "email": 1,
+    "username": 1,
+    "fullName": 1,
+    "avatar": 1,
+    "role": 1,
+    "subscription": 1,
+    "preferences": 1,
+    "apiUsage": 1,
+    "createdAt": 1,
+    "updatedAt": 1,
+    "lastLogin": 1,
+    "isVerified": 1,
+    "isActive": 1
+}
+
+USER_CREDENTIALS_PROJECTION = {"passwordHash": 1, "isActive": 1}
 
 class UserProfile(BaseModel):
     id: str
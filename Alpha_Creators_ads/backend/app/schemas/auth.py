@@ -2,9 +2,20 @@
 Authentication-related Pydantic schemas
 """
 
-from pydantic import BaseModel, EmailStr, validator
-from typing import Optional
-from app.models.user import UserResponse
+from pydantic import BaseModel, EmailStr, field_validator, model_validator
+from typing import ClassVar, Optional
+from app.models.user import UserResponse, USERNAME_RE
+
+class PasswordConfirmationModel(BaseModel):
+    """Base for requests that carry a password plus its confirmation"""
+    # Field that confirmPassword must equal
+    password_field: ClassVar[str] = "password"
+    
+    @model_validator(mode="after")
+    def validate_passwords_match(self):
+        if self.confirmPassword != getattr(self, self.password_field):
+            raise ValueError('Passwords do not match')
+        return self
 
 class LoginRequest(BaseModel):
     email: EmailStr
@@ -17,26 +28,21 @@ class LoginResponse(BaseModel):
     expires_in: int
     user: UserResponse
 
-class RegisterRequest(BaseModel):
+class RegisterRequest(PasswordConfirmationModel):
     email: EmailStr
     username: str
     fullName: str
     password: str
     confirmPassword: str
     
-    @validator('username')
+    @field_validator('username')
+    @classmethod
     def validate_username(cls, v):
         if len(v) < 3:
             raise ValueError('Username must be at least 3 characters long')
-        if not v.replace('_', '').replace('-', '').isalnum():
+        if not USERNAME_RE.fullmatch(v):
             raise ValueError('Username can only contain letters, numbers, hyphens, and underscores')
         return v.lower()
-    
-    @validator('confirmPassword')
-    def validate_passwords_match(cls, v, values):
-        if 'password' in values and v != values['password']:
-            raise ValueError('Passwords do not match')
-        return v
 
 class RegisterResponse(BaseModel):
     message: str
@@ -59,30 +65,20 @@ class ForgotPasswordRequest(BaseModel):
 class ForgotPasswordResponse(BaseModel):
     message: str
 
-class ResetPasswordRequest(BaseModel):
+class ResetPasswordRequest(PasswordConfirmationModel):
     token: str
     password: str
     confirmPassword: str
-    
-    @validator('confirmPassword')
-    def validate_passwords_match(cls, v, values):
-        if 'password' in values and v != values['password']:
-            raise ValueError('Passwords do not match')
-        return v
 
 class ResetPasswordResponse(BaseModel):
     message: str
 
-class ChangePasswordRequest(BaseModel):
+class ChangePasswordRequest(PasswordConfirmationModel):
+    password_field: ClassVar[str] = "newPassword"
+    
     currentPassword: str
     newPassword: str
     confirmPassword: str
-    
-    @validator('confirmPassword')
-    def validate_passwords_match(cls, v, values):
-        if 'newPassword' in values and v != values['newPassword']:
-            raise ValueError('Passwords do not match')
-        return v
 
 class ChangePasswordResponse(BaseModel):
     message: str
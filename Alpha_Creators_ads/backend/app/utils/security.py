@@ -2,111 +2,256 @@
 Authentication and security utilities
 """
 
-from passlib.context import CryptContext
-from jose import JWTError, jwt
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+import bcrypt
+import jwt
+from datetime import timedelta
+from typing import Optional, Dict, Any, Tuple
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import secrets
 import string
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import orjson
+import threading
+import time
+import anyio
+from cachetools import TTLCache
+from bson import ObjectId
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import re
 
 from app.config import settings
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing - bcrypt only reads the first 72 bytes, so inputs are cut there explicitly
+# (as passlib did) to stay compatible with existing hashes
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+# bcrypt releases the GIL, so a dedicated pool gives real parallelism without
+# competing with (or being starved by) the default executor used for other I/O
+_password_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="password-hash")
 
 # JWT Security
 security = HTTPBearer()
 
+# Signing key and algorithm list resolved once rather than per encode/decode call
+_SIGNING_KEY = settings.SECRET_KEY.encode()
+_JWT_ALGORITHM = settings.JWT_ALGORITHM
+_JWT_ALGORITHMS = [_JWT_ALGORITHM]
+
+# Token lifetimes in seconds; "exp" is a NumericDate, so claims use integer epochs directly
+_ACCESS_TOKEN_TTL = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+_REFRESH_TOKEN_TTL = settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+_PASSWORD_RESET_TOKEN_TTL = 3600  # 1 hour
+_EMAIL_VERIFICATION_TOKEN_TTL = 7 * 86400  # 7 days
+
+# HMAC digests usable by the fused token-pair signer
+_HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+# Header segment and HMAC state over "<header>." are identical for every token,
+# so they are computed once and the signer is copied per token
+_JWT_HEADER_SEGMENT = _b64url(json.dumps(
+    {"alg": _JWT_ALGORITHM, "typ": "JWT"}, separators=(",", ":"), sort_keys=True
+).encode())
+_TOKEN_SIGNER = (
+    hmac.new(_SIGNING_KEY, _JWT_HEADER_SEGMENT + b".", _HMAC_DIGESTS[_JWT_ALGORITHM])
+    if _JWT_ALGORITHM in _HMAC_DIGESTS else None
+)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return bcrypt.checkpw(plain_password.encode()[:BCRYPT_MAX_PASSWORD_BYTES], hashed_password.encode())
 
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
-    return pwd_context.hash(password)
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode()[:BCRYPT_MAX_PASSWORD_BYTES], salt).decode()
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
+
+async def aget_password_hash(password: str) -> str:
+    """Generate password hash without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
     
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    ttl = int(expires_delta.total_seconds()) if expires_delta else _ACCESS_TOKEN_TTL
+    to_encode["exp"] = int(time.time()) + ttl
+    encoded_jwt = jwt.encode(to_encode, _SIGNING_KEY, algorithm=_JWT_ALGORITHM)
     
     return encoded_jwt
 
 def create_refresh_token(data: Dict[str, Any]) -> str:
     """Create JWT refresh token"""
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": int(time.time()) + _REFRESH_TOKEN_TTL, "type": "refresh"})
     
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _SIGNING_KEY, algorithm=_JWT_ALGORITHM)
     return encoded_jwt
 
+def _sign_claims(claims: Dict[str, Any]) -> str:
+    """Sign JWT claims by extending a copy of the precomputed header HMAC state"""
+    payload_segment = _b64url(json.dumps(claims, separators=(",", ":")).encode())
+    signer = _TOKEN_SIGNER.copy()
+    signer.update(payload_segment)
+    return b".".join((_JWT_HEADER_SEGMENT, payload_segment, _b64url(signer.digest()))).decode()
+
+def create_token_pair(data: Dict[str, Any]) -> Tuple[str, str]:
+    """Create JWT access and refresh tokens from one set of base claims"""
+    now = int(time.time())
+    access_claims = {**data, "exp": now + _ACCESS_TOKEN_TTL}
+    refresh_claims = {**data, "exp": now + _REFRESH_TOKEN_TTL, "type": "refresh"}
+    
+    if _TOKEN_SIGNER is None:
+        return (
+            jwt.encode(access_claims, _SIGNING_KEY, algorithm=_JWT_ALGORITHM),
+            jwt.encode(refresh_claims, _SIGNING_KEY, algorithm=_JWT_ALGORITHM)
+        )
+    
+    return _sign_claims(access_claims), _sign_claims(refresh_claims)
+
+# Recently verified tokens -> decoded claims, keyed by digest so raw tokens aren't retained.
+# Locked because verify_token_async may decode from worker threads
+_verified_tokens: TTLCache = TTLCache(maxsize=100_000, ttl=60)
+_verified_tokens_lock = threading.Lock()
+
+def _b64url_decode(segment: bytes) -> bytes:
+    return base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+
+def _decode_hmac_token(token: str) -> Optional[Dict[str, Any]]:
+    """Verify an HS* token against the precomputed header HMAC state and parse its claims once
+    
+    Tokens carrying our own header segment skip header decoding entirely; the claims segment is
+    decoded a single time and only exp is checked. Returns None when the token needs the full
+    PyJWT path (other header, or aud/nbf claims); raises PyJWTError for bad signatures or expiry.
+    """
+    if _TOKEN_SIGNER is None:
+        return None
+    
+    header_segment, _, rest = token.encode().partition(b".")
+    payload_segment, _, signature_segment = rest.partition(b".")
+    if header_segment != _JWT_HEADER_SEGMENT:
+        return None
+    
+    signer = _TOKEN_SIGNER.copy()
+    signer.update(payload_segment)
+    if not hmac.compare_digest(_b64url(signer.digest()), signature_segment):
+        raise jwt.InvalidSignatureError("Signature verification failed")
+    
+    try:
+        claims = orjson.loads(_b64url_decode(payload_segment))
+    except (ValueError, binascii.Error) as e:
+        raise jwt.DecodeError("Invalid payload string") from e
+    if not isinstance(claims, dict):
+        raise jwt.DecodeError("Invalid payload string: must be a json object")
+    if "aud" in claims or "nbf" in claims:
+        return None
+    
+    exp = claims.get("exp")
+    if exp is not None:
+        if not isinstance(exp, (int, float)):
+            raise jwt.DecodeError("Expiration Time claim (exp) must be an integer.")
+        if exp < time.time():
+            raise jwt.ExpiredSignatureError("Signature has expired")
+    return claims
+
+def _decode_token(token: str) -> Dict[str, Any]:
+    """Decode a JWT, skipping signature checks for a token verified within the cache TTL
+    
+    Raises PyJWTError for invalid or expired tokens. Returned claims are shared and must not be mutated.
+    """
+    token_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    
+    with _verified_tokens_lock:
+        payload = _verified_tokens.get(token_key)
+    if payload is not None and payload.get("exp", float("inf")) > time.time():
+        return payload
+    
+    payload = _decode_hmac_token(token)
+    if payload is None:
+        payload = jwt.decode(token, _SIGNING_KEY, algorithms=_JWT_ALGORITHMS)
+    with _verified_tokens_lock:
+        _verified_tokens[token_key] = payload
+    return payload
+
 def verify_token(token: str) -> Dict[str, Any]:
     """Verify and decode JWT token"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload
-    except JWTError as e:
+        return _decode_token(token)
+    except jwt.PyJWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         ) from e
 
+async def verify_token_async(token: str) -> Dict[str, Any]:
+    """Verify and decode JWT token without stalling the event loop
+    
+    HMAC (HS*) verification is cheap and runs inline; RSA/EC signatures are
+    verified through the cryptography (OpenSSL) backend in a worker thread.
+    """
+    if _JWT_ALGORITHM.startswith("HS"):
+        return verify_token(token)
+    return await anyio.to_thread.run_sync(verify_token, token)
+
+def has_token_type(payload: Dict[str, Any], expected: str) -> bool:
+    """Check a decoded token's "type" claim in constant time"""
+    return hmac.compare_digest(str(payload.get("type", "")).encode(), expected.encode())
+
 def generate_password_reset_token(email: str) -> str:
     """Generate password reset token"""
-    data = {"sub": email, "type": "password_reset"}
-    expire = datetime.utcnow() + timedelta(hours=1)  # 1 hour expiry
-    data.update({"exp": expire})
+    data = {"sub": email, "type": "password_reset", "exp": int(time.time()) + _PASSWORD_RESET_TOKEN_TTL}
     
-    return jwt.encode(data, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    return jwt.encode(data, _SIGNING_KEY, algorithm=_JWT_ALGORITHM)
 
 def verify_password_reset_token(token: str) -> Optional[str]:
     """Verify password reset token and return email"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        if payload.get("type") != "password_reset":
+        payload = _decode_token(token)
+        if not has_token_type(payload, "password_reset"):
             return None
         return payload.get("sub")
-    except JWTError:
+    except jwt.PyJWTError:
         return None
 
 def generate_verification_token(email: str) -> str:
     """Generate email verification token"""
-    data = {"sub": email, "type": "email_verification"}
-    expire = datetime.utcnow() + timedelta(days=7)  # 7 days expiry
-    data.update({"exp": expire})
+    data = {"sub": email, "type": "email_verification", "exp": int(time.time()) + _EMAIL_VERIFICATION_TOKEN_TTL}
     
-    return jwt.encode(data, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    return jwt.encode(data, _SIGNING_KEY, algorithm=_JWT_ALGORITHM)
 
 def verify_email_token(token: str) -> Optional[str]:
     """Verify email verification token and return email"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        if payload.get("type") != "email_verification":
+        payload = _decode_token(token)
+        if not has_token_type(payload, "email_verification"):
             return None
         return payload.get("sub")
-    except JWTError:
+    except jwt.PyJWTError:
         return None
 
 def generate_api_key() -> str:
-    """Generate a secure API key"""
-    alphabet = string.ascii_letters + string.digits
-    return ''.join(secrets.choice(alphabet) for _ in range(32))
+    """Generate a secure API key (32 URL-safe characters from a single urandom read)"""
+    return secrets.token_urlsafe(24)
 
 async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Get current user ID from JWT token"""
-    payload = verify_token(credentials.credentials)
-    user_id: str = payload.get("sub")
+    user_id: str = verify_token(credentials.credentials).get("sub")
     
     if user_id is None:
         raise HTTPException(
@@ -117,11 +262,33 @@ async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depend
     
     return user_id
 
+async def get_current_user_oid(user_id: str = Depends(get_current_user_id)) -> ObjectId:
+    """Get current user ID from JWT token, parsed as an ObjectId"""
+    if not ObjectId.is_valid(user_id):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return ObjectId(user_id)
+
 async def get_current_user_payload(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """Get current user payload from JWT token"""
     return verify_token(credentials.credentials)
 
 # Password validation
+PASSWORD_SPECIAL_CHARACTERS = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+
+# Character classes, tested against the set of distinct password characters
+_UPPERCASE = frozenset(string.ascii_uppercase)
+_LOWERCASE = frozenset(string.ascii_lowercase)
+_DIGITS = frozenset(string.digits)
+_SPECIAL = frozenset(PASSWORD_SPECIAL_CHARACTERS)
+
+_COMMON_PATTERNS = ("password", "123456", "qwerty", "admin")
+# One case-insensitive alternation scans the password once for every pattern, without a lowered copy
+_COMMON_PATTERN_RE = re.compile("|".join(map(re.escape, _COMMON_PATTERNS)), re.IGNORECASE)
+
 def validate_password_strength(password: str) -> Dict[str, Any]:
     """Validate password strength and return detailed feedback"""
     errors = []
@@ -137,11 +304,13 @@ def validate_password_strength(password: str) -> Dict[str, Any]:
         score += 1
         suggestions.append("Consider using a longer password (12+ characters)")
     
-    # Character variety checks
-    has_upper = any(c.isupper() for c in password)
-    has_lower = any(c.islower() for c in password)
-    has_digit = any(c.isdigit() for c in password)
-    has_special = any(c in "!@#$%^&*()_+-=[]{}|;:,.<>?" for c in password)
+    # Character variety checks - a single pass collects the distinct characters,
+    # so each class test is bounded by the alphabet rather than the input length
+    characters = set(password)
+    has_upper = not _UPPERCASE.isdisjoint(characters)
+    has_lower = not _LOWERCASE.isdisjoint(characters)
+    has_digit = not _DIGITS.isdisjoint(characters)
+    has_special = not _SPECIAL.isdisjoint(characters)
     
     if not has_upper:
         errors.append("Password must contain at least one uppercase letter")
@@ -164,8 +333,7 @@ def validate_password_strength(password: str) -> Dict[str, Any]:
         score += 2
     
     # Common password patterns
-    common_patterns = ["password", "123456", "qwerty", "admin"]
-    if any(pattern in password.lower() for pattern in common_patterns):
+    if _COMMON_PATTERN_RE.search(password):
         errors.append("Password contains common patterns")
         score -= 2
     
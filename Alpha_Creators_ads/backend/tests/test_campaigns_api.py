@@ -0,0 +1,233 @@
+"""
+Endpoint tests for the campaign quota check and conditional GETs in app.api.v1.campaigns.
+"""
+
+import asyncio
+import os
+from datetime import datetime
+
+os.environ.setdefault("SECRET_KEY", "test-secret-key-for-the-backend-test-suite")
+
+import httpx
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+
+from app.api.v1 import campaigns
+from app.cache import CacheKeys, get_cache
+from app.database import get_db
+from app.utils.security import get_current_user_id, get_current_user_oid
+
+USER_OID = ObjectId()
+USER_ID = str(USER_OID)
+
+CAMPAIGN_PAYLOAD = {
+    "name": "Spring launch",
+    "description": "Launch campaign",
+    "objective": "awareness",
+    "budget": {"total": 500.0},
+    "schedule": {"startDate": "2030-01-01T00:00:00"},
+    "platforms": ["google"]
+}
+
+
+class FakeCache:
+    """In-memory stand-in for CacheManager with Redis INCRBY semantics."""
+
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+        self.deleted = []
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def get_many(self, *keys):
+        return [self.values.get(key) for key in keys]
+
+    async def set(self, key, value, ttl=None):
+        self.values[key] = value
+        return True
+
+    async def increment(self, key, amount=1, ttl=None):
+        # A missing key is recreated from 0, as Redis does
+        self.values[key] = self.values.get(key, 0) + amount
+        return self.values[key]
+
+    async def delete(self, key):
+        self.deleted.append(key)
+        return self.values.pop(key, None) is not None
+
+
+class FakeAggregateCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length):
+        return self.documents
+
+
+class FakeUsers:
+    def __init__(self, plan, campaign_count):
+        self.plan = plan
+        self.campaign_count = campaign_count
+        self.aggregations = 0
+
+    async def aggregate(self, pipeline):
+        self.aggregations += 1
+        return FakeAggregateCursor([
+            {"_id": USER_OID, "subscription": {"plan": self.plan}, "campaignCount": self.campaign_count}
+        ])
+
+
+class FakeInsertResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class FakeCampaigns:
+    def __init__(self, documents=()):
+        self.documents = {doc["_id"]: doc for doc in documents}
+
+    async def insert_one(self, document):
+        document["_id"] = ObjectId()
+        self.documents[document["_id"]] = dict(document)
+        return FakeInsertResult(document["_id"])
+
+    async def find_one(self, query, projection=None):
+        document = self.documents.get(query["_id"])
+        if document and document["userId"] == query["userId"]:
+            return dict(document)
+        return None
+
+
+class FakeDB:
+    def __init__(self, users=None, campaigns_collection=None):
+        self.users = users
+        self.campaigns = campaigns_collection or FakeCampaigns()
+
+
+def _campaign_document():
+    now = datetime(2030, 1, 1)
+    return {
+        "_id": ObjectId(),
+        "userId": USER_OID,
+        "name": "Stored campaign",
+        "description": None,
+        "objective": "traffic",
+        "status": "draft",
+        "budget": {"total": 100.0, "spent": 0.0, "currency": "USD", "dailyLimit": None},
+        "schedule": {"startDate": now},
+        "targeting": {},
+        "platforms": ["google"],
+        "analytics": dict(campaigns.DEFAULT_CAMPAIGN_ANALYTICS),
+        "createdAt": now,
+        "updatedAt": now
+    }
+
+
+def _request(db, cache, method, url, **kwargs):
+    """Issue one request against the campaigns router with db, cache and auth overridden."""
+    app = FastAPI()
+    app.include_router(campaigns.router, prefix="/api/v1/campaigns")
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_cache] = lambda: cache
+    app.dependency_overrides[get_current_user_id] = lambda: USER_ID
+    app.dependency_overrides[get_current_user_oid] = lambda: USER_OID
+
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, url, **kwargs)
+
+    return asyncio.run(send())
+
+
+class TestCreateCampaignQuota:
+    """The campaign limit is enforced from cache without trusting a stale count."""
+
+    def test_rejects_at_plan_limit(self):
+        db = FakeDB(users=FakeUsers(plan="free", campaign_count=campaigns.CAMPAIGN_LIMITS["free"]))
+        cache = FakeCache()
+
+        response = _request(db, cache, "POST", "/api/v1/campaigns/", json=CAMPAIGN_PAYLOAD)
+
+        assert response.status_code == 403
+        assert db.users.aggregations == 1
+        assert db.campaigns.documents == {}
+
+    def test_under_limit_is_served_from_cache(self):
+        db = FakeDB(users=FakeUsers(plan="free", campaign_count=0))
+        cache = FakeCache({
+            CacheKeys.user_plan(USER_ID): "free",
+            CacheKeys.user_campaign_count(USER_ID): 1
+        })
+
+        response = _request(db, cache, "POST", "/api/v1/campaigns/", json=CAMPAIGN_PAYLOAD)
+
+        assert response.status_code == 201
+        assert db.users.aggregations == 0
+        assert cache.values[CacheKeys.user_campaign_count(USER_ID)] == 2
+
+    @pytest.mark.parametrize("db_count, expected_status", [(1, 201), (3, 403)])
+    def test_cached_at_limit_count_is_rechecked(self, db_count, expected_status):
+        db = FakeDB(users=FakeUsers(plan="free", campaign_count=db_count))
+        cache = FakeCache({
+            CacheKeys.user_plan(USER_ID): "free",
+            CacheKeys.user_campaign_count(USER_ID): campaigns.CAMPAIGN_LIMITS["free"]
+        })
+
+        response = _request(db, cache, "POST", "/api/v1/campaigns/", json=CAMPAIGN_PAYLOAD)
+
+        assert response.status_code == expected_status
+        assert db.users.aggregations == 1
+
+    def test_count_recreated_by_increment_is_dropped(self):
+        count_key = CacheKeys.user_campaign_count(USER_ID)
+        db = FakeDB(users=FakeUsers(plan="free", campaign_count=2))
+
+        class ExpiringCache(FakeCache):
+            async def increment(self, key, amount=1, ttl=None):
+                # The key expires between the quota read and the INCRBY
+                self.values.pop(key, None)
+                return await super().increment(key, amount, ttl)
+
+        cache = ExpiringCache({CacheKeys.user_plan(USER_ID): "free", count_key: 2})
+
+        response = _request(db, cache, "POST", "/api/v1/campaigns/", json=CAMPAIGN_PAYLOAD)
+
+        assert response.status_code == 201
+        assert count_key in cache.deleted
+        assert count_key not in cache.values
+
+
+class TestConditionalGet:
+    """Campaign reads carry an ETag and honour If-None-Match."""
+
+    def test_matching_etag_returns_304(self):
+        document = _campaign_document()
+        db = FakeDB(campaigns_collection=FakeCampaigns([document]))
+        url = f"/api/v1/campaigns/{document['_id']}"
+
+        first = _request(db, FakeCache(), "GET", url)
+        etag = first.headers["etag"]
+
+        assert first.status_code == 200
+        assert first.json()["name"] == "Stored campaign"
+
+        second = _request(db, FakeCache(), "GET", url, headers={"If-None-Match": etag})
+
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+        assert second.content == b""
+
+    def test_stale_etag_returns_full_body(self):
+        document = _campaign_document()
+        db = FakeDB(campaigns_collection=FakeCampaigns([document]))
+
+        response = _request(
+            db, FakeCache(), "GET", f"/api/v1/campaigns/{document['_id']}",
+            headers={"If-None-Match": 'W/"stale"'}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["id"] == str(document["_id"])
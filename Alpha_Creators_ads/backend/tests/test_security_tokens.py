@@ -0,0 +1,131 @@
+"""
+Tests for JWT signing and verification in app.utils.security.
+"""
+
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "test-secret-key-for-the-backend-test-suite")
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from app.utils import security
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    """Start every test with an empty verified-token cache."""
+    security._verified_tokens.clear()
+    yield
+    security._verified_tokens.clear()
+
+
+def _decode_with_pyjwt(token):
+    return jwt.decode(token, security._SIGNING_KEY, algorithms=security._JWT_ALGORITHMS)
+
+
+def _tamper(segment):
+    """Flip the first character of a base64url segment."""
+    return ("A" if segment[0] != "A" else "B") + segment[1:]
+
+
+class TestFastPathSigning:
+    """Tokens minted by the precomputed-HMAC signer."""
+
+    def test_token_pair_round_trips_through_pyjwt(self):
+        access_token, refresh_token = security.create_token_pair({"sub": "user-1"})
+
+        access_claims = _decode_with_pyjwt(access_token)
+        refresh_claims = _decode_with_pyjwt(refresh_token)
+
+        assert access_claims["sub"] == "user-1"
+        assert "type" not in access_claims
+        assert refresh_claims["sub"] == "user-1"
+        assert refresh_claims["type"] == "refresh"
+        assert refresh_claims["exp"] > access_claims["exp"]
+
+    def test_fast_path_matches_pyjwt_for_pyjwt_tokens(self):
+        token = jwt.encode(
+            {"sub": "user-2", "exp": int(time.time()) + 60},
+            security._SIGNING_KEY,
+            algorithm=security._JWT_ALGORITHM
+        )
+
+        assert security._decode_hmac_token(token) == _decode_with_pyjwt(token)
+
+    def test_tampered_signature_is_rejected(self):
+        access_token, _ = security.create_token_pair({"sub": "user-3"})
+        header, payload, signature = access_token.split(".")
+        tampered = ".".join((header, payload, _tamper(signature)))
+
+        with pytest.raises(jwt.InvalidSignatureError):
+            security._decode_hmac_token(tampered)
+
+    def test_tampered_payload_is_rejected(self):
+        access_token, _ = security.create_token_pair({"sub": "user-4"})
+        header, payload, signature = access_token.split(".")
+        tampered = ".".join((header, _tamper(payload), signature))
+
+        with pytest.raises(jwt.InvalidSignatureError):
+            security._decode_hmac_token(tampered)
+
+    def test_expired_token_is_rejected(self):
+        token = security._sign_claims({"sub": "user-5", "exp": int(time.time()) - 10})
+
+        with pytest.raises(jwt.ExpiredSignatureError):
+            security._decode_hmac_token(token)
+        with pytest.raises(HTTPException) as exc_info:
+            security.verify_token(token)
+        assert exc_info.value.status_code == 401
+
+
+class TestPyJWTFallback:
+    """Tokens the fast path declines are verified by PyJWT."""
+
+    def test_foreign_header_falls_back(self):
+        token = jwt.encode(
+            {"sub": "user-6", "exp": int(time.time()) + 60},
+            security._SIGNING_KEY,
+            algorithm=security._JWT_ALGORITHM,
+            headers={"kid": "other"}
+        )
+
+        assert security._decode_hmac_token(token) is None
+        assert security.verify_token(token)["sub"] == "user-6"
+
+    @pytest.mark.parametrize("claim", [{"aud": "someone-else"}, {"nbf": int(time.time()) + 3600}])
+    def test_aud_and_nbf_fall_back(self, claim):
+        token = security._sign_claims({"sub": "user-7", "exp": int(time.time()) + 60, **claim})
+
+        assert security._decode_hmac_token(token) is None
+        # PyJWT rejects an unexpected audience and a not-yet-valid token
+        with pytest.raises(HTTPException) as exc_info:
+            security.verify_token(token)
+        assert exc_info.value.status_code == 401
+
+
+class TestVerifiedTokenCache:
+    """Cached claims never outlive the token's exp."""
+
+    def test_cache_hit_is_served_without_reverifying(self, monkeypatch):
+        access_token, _ = security.create_token_pair({"sub": "user-8"})
+        claims = security.verify_token(access_token)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("cached token was re-verified")
+
+        monkeypatch.setattr(security, "_decode_hmac_token", fail)
+        assert security.verify_token(access_token) is claims
+
+    def test_cache_hit_past_exp_is_rejected(self, monkeypatch):
+        exp = int(time.time()) + 30
+        token = security._sign_claims({"sub": "user-9", "exp": exp})
+        assert security.verify_token(token)["sub"] == "user-9"
+
+        # Still inside the cache TTL, but past the token's own expiry
+        monkeypatch.setattr(security.time, "time", lambda: exp + 1)
+        with pytest.raises(HTTPException) as exc_info:
+            security.verify_token(token)
+        assert exc_info.value.status_code == 401